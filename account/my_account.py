@@ -1,12 +1,72 @@
-import requests, jwt, uuid, os, time
+import base64, hashlib, hmac, itertools, requests, os, time, random
+from operator import itemgetter
+from urllib.parse import urlencode, unquote
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# ✅ orjson이 있으면 JSON 처리에 사용 (stdlib json보다 2~5배 빠름), 없으면 기본 모듈 사용
+try:
+    import orjson
+
+    def _json(response):
+        return orjson.loads(response.content)
+
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+
+    def _json(response):
+        return response.json()
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
 # ✅ 업비트 API 엔드포인트
 UPBIT_ACCOUNT_URL = "https://api.upbit.com/v1/accounts"
 UPBIT_ORDER_URL = "https://api.upbit.com/v1/order"
 
+# ✅ 커넥션 재사용용 세션 (매 호출마다 TLS 핸드셰이크 방지)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+_SESSION.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+
+# ✅ (연결 타임아웃, 읽기 타임아웃) - 세션 고갈 방지
+_REQUEST_TIMEOUT = (3, 10)
+
+# ✅ 429 재시도 설정 (지수 백오프 + 지터)
+_MAX_ATTEMPTS = 6
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 30.0
+
+def _request_with_retry(url, params=None):
+    """📌 429(요청 과다) 응답 시 지수 백오프 + 지터로 재시도하는 GET 요청
+
+    재귀 호출 대신 반복문을 사용하고, Retry-After 헤더가 있으면 우선 적용한다.
+    모든 재시도 실패 시 마지막 응답(또는 None)을 반환한다.
+    """
+    response = None
+    for attempt in range(_MAX_ATTEMPTS):
+        response = _SESSION.get(url, params=params, headers=generate_headers(params), timeout=_REQUEST_TIMEOUT)
+
+        if response.status_code != 429:
+            return response
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                wait_time = float(retry_after)
+            except ValueError:
+                wait_time = _BACKOFF_BASE * (2 ** attempt)
+        else:
+            wait_time = min(_BACKOFF_CAP, _BACKOFF_BASE * (2 ** attempt)) + random.uniform(0, 0.5)
+
+        print(f"🚨 요청이 너무 많습니다! {wait_time:.1f}초 후 재시도 ({attempt + 1}/{_MAX_ATTEMPTS})")
+        time.sleep(wait_time)
+
+    return response
+
 # ✅ 환경 변수에서 API 키 로드
 ACCESS_KEY = os.getenv("ACCESS_KEY", "")
 SECRET_KEY = os.getenv("SECRET_KEY", "")
@@ -14,58 +74,154 @@ SECRET_KEY = os.getenv("SECRET_KEY", "")
 if not ACCESS_KEY or not SECRET_KEY:
     raise ValueError("🚨 API 키(ACCESS_KEY, SECRET_KEY)가 설정되지 않았습니다! .env 파일을 확인하세요.")
 
-def generate_headers():
-    """JWT 인증 헤더 생성 (SECRET_KEY가 없으면 오류 발생 방지)"""
+# ✅ JWT 구성 요소 사전 계산 (헤더 직렬화 + HMAC 컨텍스트 생성 비용을 1회로 축소)
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"typ":"JWT","alg":"HS256"}').rstrip(b"=")
+_HMAC_BASE = hmac.new(SECRET_KEY.encode(), digestmod=hashlib.sha256)
+
+def _encode_jwt(payload: dict) -> str:
+    """📌 고정 헤더 + 복사된 HMAC 컨텍스트로 HS256 JWT를 직접 조립"""
+    signing_input = _JWT_HEADER_B64 + b"." + base64.urlsafe_b64encode(_dumps(payload)).rstrip(b"=")
+    mac = _HMAC_BASE.copy()
+    mac.update(signing_input)
+    return (signing_input + b"." + base64.urlsafe_b64encode(mac.digest()).rstrip(b"=")).decode()
+
+# ✅ nonce 생성: uuid4의 getrandom 시스콜 대신 pid + 단조 시계 + 카운터 조합
+# (업비트는 nonce의 유일성만 요구하므로 암호학적 난수가 필요 없음)
+_nonce_ctr = itertools.count()
+_pid = os.getpid()
+
+def _next_nonce() -> str:
+    return f"{_pid}-{time.monotonic_ns()}-{next(_nonce_ctr)}"
+
+# ✅ JWT 토큰 캐시 (유효 시간 내 재사용 → 매 호출마다 서명 비용 제거)
+_TOKEN_TTL = 1.0  # 초 단위, nonce 중복 방지를 위해 짧게 유지
+_token_cache = {"headers": None, "created_at": 0.0}
+
+def generate_headers(query_params=None):
+    """JWT 인증 헤더 생성 (SECRET_KEY가 없으면 오류 발생 방지)
+
+    쿼리 파라미터가 있으면 업비트 규격대로 query_hash를 페이로드에 포함한다.
+    """
     if not SECRET_KEY:
         raise ValueError("🚨 SECRET_KEY가 설정되지 않았습니다! .env 파일을 확인하세요.")
 
-    token = jwt.encode({"access_key": ACCESS_KEY, "nonce": str(uuid.uuid4())}, SECRET_KEY)
+    # ✅ 파라미터 없는 호출은 TTL 이내 기존 토큰 재사용 (서명 비용 절약)
+    now = time.monotonic()
+    if not query_params:
+        if _token_cache["headers"] is not None and now - _token_cache["created_at"] < _TOKEN_TTL:
+            return _token_cache["headers"]
+
+        token = _encode_jwt({"access_key": ACCESS_KEY, "nonce": _next_nonce()})
+        headers = {"Authorization": f"Bearer {token}"}
+        _token_cache["headers"] = headers
+        _token_cache["created_at"] = now
+        return headers
+
+    # 파라미터별로 해시가 달라지므로 토큰 캐시는 사용하지 않음
+    query_string = unquote(urlencode(query_params, doseq=True)).encode()
+    token = _encode_jwt({
+        "access_key": ACCESS_KEY,
+        "nonce": _next_nonce(),
+        "query_hash": hashlib.sha512(query_string).hexdigest(),
+        "query_hash_alg": "SHA512",
+    })
     return {"Authorization": f"Bearer {token}"}
 
 def check_order_status(order_uuid):
     """주문 UUID를 이용해 체결 여부 확인"""
-    response = requests.get(UPBIT_ORDER_URL, params={"uuid": order_uuid}, headers=generate_headers())
+    response = _request_with_retry(UPBIT_ORDER_URL, params={"uuid": order_uuid})
 
-    if response.status_code == 200:
-        return response.json()  # ✅ 주문 상세 정보 반환
+    if response is not None and response.status_code == 200:
+        return _json(response)  # ✅ 주문 상세 정보 반환
     else:
         print(f"❌ 주문 상태 조회 실패: {response.text}")
         return None
 
+# ✅ 주문 일괄 조회 엔드포인트 (uuids[] 기준 최대 100건)
+UPBIT_ORDERS_UUIDS_URL = "https://api.upbit.com/v1/orders/uuids"
+
+def get_orders_by_uuids(order_uuids):
+    """📌 여러 주문 UUID를 호출 1회(100건 단위)로 일괄 조회
+
+    :return: {uuid: 주문 상세 or None}
+    """
+    order_uuids = list(order_uuids)
+    if not order_uuids:
+        return {}
+
+    found = {}
+    for i in range(0, len(order_uuids), 100):
+        params = {"uuids[]": order_uuids[i:i + 100]}
+        response = _request_with_retry(UPBIT_ORDERS_UUIDS_URL, params=params)
+        if response is not None and response.status_code == 200:
+            for order in _json(response):
+                found[order["uuid"]] = order
+        else:
+            print(f"❌ 주문 일괄 조회 실패: {response.text if response is not None else '응답 없음'}")
+
+    return {u: found.get(u) for u in order_uuids}
+
 def get_my_exchange_account():
     """내 계좌 조회 (보유 코인 정보 포함)"""
-    response = requests.get(UPBIT_ACCOUNT_URL, headers=generate_headers())
+    response = _request_with_retry(UPBIT_ACCOUNT_URL)
 
+    if response is None or response.status_code == 429:
+        print("🚨 요청이 너무 많습니다! 재시도 한도 초과.")
+        return None
     if response.status_code == 403:
         print("🚨 API 접근이 금지되었습니다. API 키를 확인하세요!")
         return None
-    if response.status_code == 429:
-        print("🚨 요청이 너무 많습니다! 잠시 후 다시 시도하세요.")
-        time.sleep(5)
-        return get_my_exchange_account()  # 5초 후 재시도
     if response.status_code != 200:
         print(f"🚨 업비트 API 요청 실패: {response.text}")
         return None
 
-    account_data = response.json()
-
-    # ✅ 원화(KRW) 잔고 확인
-    krw_account = next((item for item in account_data if item["currency"] == "KRW"), None)
-    krw_balance = float(krw_account["balance"]) - float(krw_account["locked"]) if krw_account else 0
+    account_data = _json(response)
 
-    # ✅ 보유 코인 정보 (원화 마켓 코인만 필터링)
+    # ✅ 원화(KRW) 잔고 + 보유 코인 정보를 한 번의 순회로 집계
+    krw_balance = 0.0
     holdings = {}
+    _float = float  # 지역 바인딩으로 반복 조회 비용 절감
+    _fields = itemgetter("balance", "locked", "avg_buy_price")  # C 레벨 일괄 추출
+
     for asset in account_data:
-        if asset["currency"] == "KRW":  # 원화는 별도로 저장
+        currency = asset["currency"]
+        balance, locked, avg_buy_price = _fields(asset)
+        if currency == "KRW":  # 원화는 별도로 저장
+            krw_balance = _float(balance) - _float(locked)
             continue
 
-        holdings[asset["currency"]] = {
-            "balance": float(asset["balance"]),  # 보유 수량
-            "locked": float(asset["locked"]),  # 주문 중 묶인 수량
-            "avg_buy_price": float(asset["avg_buy_price"]),  # 평균 매수가
+        holdings[currency] = {
+            "balance": _float(balance),  # 보유 수량
+            "locked": _float(locked),  # 주문 중 묶인 수량
+            "avg_buy_price": _float(avg_buy_price),  # 평균 매수가
         }
 
-    return {"KRW": krw_balance, "assets": holdings}
+    # ✅ 통화별 조회는 assets dict가 이미 O(1)로 제공하므로 별도 인덱스를 만들지 않음
+    result = {"KRW": krw_balance, "assets": holdings}
+
+    # ✅ 직접 호출한 최신 결과도 캐시에 기록 → 직후의 get_account_cached가 재조회하지 않음
+    _account_cache["v"] = result
+    _account_cache["t"] = time.monotonic()
+    return result
+
+
+# ✅ 계좌 조회 결과 단기 캐시 (티커마다 전체 계좌 API 왕복 방지)
+_ACCOUNT_CACHE_TTL = 1.0
+_account_cache = {"t": 0.0, "v": None}
+
+def invalidate_account_cache():
+    """📌 매수/매도 직후 호출하여 캐시된 계좌 정보를 무효화"""
+    _account_cache["t"] = 0.0
+    _account_cache["v"] = None
+
+def get_account_cached(ttl=_ACCOUNT_CACHE_TTL):
+    """📌 TTL 이내 재호출 시 캐시된 계좌 정보 반환 (API 왕복 절약)"""
+    now = time.monotonic()
+    if _account_cache["v"] is not None and now - _account_cache["t"] < ttl:
+        return _account_cache["v"]
+
+    # ✅ 성공 시 get_my_exchange_account 내부에서 캐시를 갱신함
+    return get_my_exchange_account()
 
 
 def get_order_list(limit=10):
@@ -80,21 +236,20 @@ def get_order_list(limit=10):
         "limit": limit,  # 최근 주문 개수 조정 가능 (기본: 10개)
     }
 
-    response = requests.get(url, params=query, headers=generate_headers())
+    response = _request_with_retry(url, params=query)
 
+    if response is None or response.status_code == 429:
+        print("🚨 요청이 너무 많습니다! 재시도 한도 초과.")
+        return []
     if response.status_code == 403:
         print("🚨 API 접근이 금지되었습니다. API 키를 확인하세요!")
         return []
-    if response.status_code == 429:
-        print("🚨 요청이 너무 많습니다! 5초 후 다시 시도합니다.")
-        time.sleep(5)
-        return get_order_list(limit)  # 5초 후 재시도
     if response.status_code != 200:
         print(f"🚨 주문 리스트 조회 실패! 상태 코드: {response.status_code}, 응답: {response.text}")
         return []
 
     try:
-        orders = response.json()
+        orders = _json(response)
         if isinstance(orders, list):
             return orders  # ✅ 주문 리스트 반환
         else:
@@ -107,7 +262,7 @@ def get_order_list(limit=10):
 def get_balance(market: str, account_data=None) -> float:
     """📌 특정 마켓(KRW-BTC)에서 보유한 코인 개수 조회 (불필요한 API 호출 방지)"""
     if account_data is None:
-        account_data = get_my_exchange_account()
+        account_data = get_account_cached()
     if not account_data or "assets" not in account_data:
         return 0.0
 
@@ -1,27 +1,30 @@
 # auto_export.py
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
 from export_logs import export_logs_to_excel
 from generate_report import generate_daily_report
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # 로그 설정 (옵션)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 
+def run_daily_exports():
+  # ✅ 엑셀 추출과 리포트 생성은 대부분 I/O → 병렬 실행으로 총 소요 시간 단축
+  with ThreadPoolExecutor(max_workers=2) as executor:
+    list(executor.map(lambda job: job(), [export_logs_to_excel, generate_daily_report]))
+
 def start_scheduler():
-  scheduler = BackgroundScheduler()
+  # ✅ 프로세스 유지용 대기 루프 대신 BlockingScheduler가 직접 블로킹
+  #    (시그널 수신 즉시 종료, 별도 keep-alive 스레드 불필요)
+  scheduler = BlockingScheduler()
 
-  # ✅ 두 가지 작업 모두 예약
-  scheduler.add_job(export_logs_to_excel, 'cron', hour=19, minute=00)
-  scheduler.add_job(generate_daily_report, 'cron', hour=19, minute=00)
+  # ✅ 두 작업을 하나의 잡으로 묶어 병렬 수행 (밀린 실행은 1회로 합침)
+  scheduler.add_job(run_daily_exports, 'cron', hour=19, minute=00, coalesce=True, max_instances=1)
 
-  scheduler.start()
   logging.info("📅 자동 로그 및 리포트 추출 스케줄러 시작됨 (매일 19:00)")
-
   try:
-    while True:
-      time.sleep(1)
+    scheduler.start()
   except (KeyboardInterrupt, SystemExit):
     logging.info("⏹️ 자동 추출 스케줄러 종료 중...")
-    scheduler.shutdown()
+    scheduler.shutdown(wait=False)
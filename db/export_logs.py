@@ -1,26 +1,35 @@
 import sqlite3
 from datetime import datetime
 import os  # os 모듈을 추가하여 디렉토리 확인 및 생성
-import pandas as pd
+from openpyxl import Workbook
 
 DB_FILE = "trading.db"
 
 def export_logs_to_excel():
   try:
-    # 'logs' 디렉토리가 존재하는지 확인하고, 없으면 생성
-    if not os.path.exists("logs"):
-      os.makedirs("logs")
+    # 'logs' 디렉토리가 없으면 생성 (exists 선확인 없이 원자적으로 처리)
+    os.makedirs("logs", exist_ok=True)
 
+    # ✅ DataFrame 없이 커서에서 바로 엑셀로 스트리밍 (메모리 O(행) 유지)
     with sqlite3.connect(DB_FILE) as conn:
-      df = pd.read_sql_query("SELECT * FROM trade_logs", conn)
+      cursor = conn.execute("SELECT * FROM trade_logs")
 
-    if df.empty:
+      wb = Workbook(write_only=True)
+      ws = wb.create_sheet("trade_logs")
+      ws.append([col[0] for col in cursor.description])
+
+      row_count = 0
+      for row in cursor:
+        ws.append(row)
+        row_count += 1
+
+    if row_count == 0:
       print("❌ 추출할 데이터가 없습니다.")
       return
 
     today = datetime.now().strftime("%Y-%m-%d")
     filename = f"logs/strategy_logs_export_{today}.xlsx"
-    df.to_excel(filename, index=False)
+    wb.save(filename)
     print(f"✅ 로그가 성공적으로 엑셀로 저장되었습니다 → {filename}")
   except Exception as e:
     print(f"🚨 엑셀 저장 중 오류: {e}")
@@ -2,12 +2,16 @@ import os
 import smtplib
 import sqlite3
 import ssl
-from datetime import datetime
-from email import encoders
-from email.mime.base import MIMEBase
+from datetime import datetime, timedelta
+from email.mime.application import MIMEApplication
+from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+import matplotlib
+
+matplotlib.use("Agg")  # ✅ GUI 탐색 없이 파일 렌더링 전용 백엔드 사용
+
 import matplotlib.pyplot as plt
 import pandas as pd
 from dotenv import load_dotenv
@@ -25,6 +29,45 @@ RECEIVER_EMAIL = os.getenv('RECEIVER_EMAIL', '')
 # 한글 폰트 설정 (Malgun Gothic 사용)
 rc('font', family='Malgun Gothic')
 
+# ✅ Figure를 모듈 레벨에서 한 번만 만들고 호출마다 재사용 (폰트/레이아웃 워밍업 1회)
+_fig, _ax = plt.subplots(figsize=(8, 4))
+
+
+# ✅ SMTP 연결 캐시 (보낼 때마다 TLS 핸드셰이크 + 로그인 방지)
+_smtp_conn = None
+
+def _get_smtp_connection():
+    global _smtp_conn
+
+    # 살아있는 연결이면 재사용 (NOOP 응답으로 생존 확인)
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.noop()
+            return _smtp_conn
+        except smtplib.SMTPException:
+            _smtp_conn = None
+
+    context = ssl.create_default_context()
+    conn = smtplib.SMTP_SSL(SMTP_SERVER, SMTP_SSL_PORT, context=context)
+    conn.login(SENDER_EMAIL, SENDER_PASSWORD)
+    _smtp_conn = conn
+    return conn
+
+def _build_attachment(attachment_path):
+    """📌 파일 종류에 맞는 MIME 파트 생성 (PNG는 MIMEImage, 그 외는 MIMEApplication)"""
+    filename = os.path.basename(attachment_path)
+    with open(attachment_path, 'rb') as f:
+        payload = f.read()
+
+    if filename.lower().endswith('.png'):
+        part = MIMEImage(payload, _subtype='png')
+    elif filename.lower().endswith('.xlsx'):
+        part = MIMEApplication(payload, _subtype='vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    else:
+        part = MIMEApplication(payload)
+
+    part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
+    return part
 
 def send_email_with_attachment(subject, body, attachment_paths):
     msg = MIMEMultipart()
@@ -35,48 +78,54 @@ def send_email_with_attachment(subject, body, attachment_paths):
     msg.attach(MIMEText(body, 'plain'))
 
     for attachment_path in attachment_paths:
-        with open(attachment_path, 'rb') as f:
-            part = MIMEBase('application', 'octet-stream')
-            part.set_payload(f.read())
-            encoders.encode_base64(part)
-            part.add_header('Content-Disposition', f'attachment; filename="{os.path.basename(attachment_path)}"')
-            msg.attach(part)
+        msg.attach(_build_attachment(attachment_path))
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_SSL_PORT, context=context) as server:
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.sendmail(SENDER_EMAIL, RECEIVER_EMAIL, msg.as_string())
+    server = _get_smtp_connection()
+    server.sendmail(SENDER_EMAIL, RECEIVER_EMAIL, msg.as_string())
 
 def generate_daily_report():
     today = datetime.now().strftime("%Y-%m-%d")
     db_path = "trading.db"
 
+    # ✅ DATE(timestamp) 함수 비교 대신 범위 조건 사용 → timestamp 인덱스로 range seek 가능
+    day_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1)
+    date_filter = "timestamp >= ? AND timestamp < ?"
+    date_params = (day_start.strftime("%Y-%m-%d %H:%M:%S"), day_end.strftime("%Y-%m-%d %H:%M:%S"))
+
     with sqlite3.connect(db_path) as conn:
-        query = "SELECT * FROM trade_logs WHERE DATE(timestamp) = DATE('now', 'localtime')"
-        df = pd.read_sql_query(query, conn)
-
-    if df.empty:
-        print("❌ 오늘 거래 내역이 없습니다.")
-        return
-
-    total_profit = df["profit_rate"].dropna().sum()
-    avg_profit = df["profit_rate"].dropna().mean()
-    trade_count = len(df)
-    tickers = df["ticker"].nunique()
-
-    grouped = df.groupby("ticker")["profit_rate"].mean().reset_index()
-    grouped.columns = ["티커", "평균 수익률"]
-
-    # ✅ 수익률 그래프 생성
-    plt.figure(figsize=(8, 4))
-    plt.bar(grouped["티커"], grouped["평균 수익률"], color='skyblue')
-    plt.title("티커별 평균 수익률")
-    plt.xlabel("티커")
-    plt.ylabel("수익률 (%)")
-    plt.grid(True)
+        # ✅ 집계는 pandas 대신 SQL에서 처리 (전체 테이블 DataFrame 불필요)
+        total_profit, avg_profit, trade_count, tickers = conn.execute(
+            f"SELECT COALESCE(SUM(profit_rate), 0), COALESCE(AVG(profit_rate), 0), "
+            f"COUNT(*), COUNT(DISTINCT ticker) FROM trade_logs WHERE {date_filter}",
+            date_params,
+        ).fetchone()
+
+        if trade_count == 0:
+            print("❌ 오늘 거래 내역이 없습니다.")
+            return
+
+        grouped = pd.read_sql_query(
+            f"SELECT ticker AS 티커, AVG(profit_rate) AS '평균 수익률' "
+            f"FROM trade_logs WHERE {date_filter} GROUP BY ticker",
+            conn,
+            params=date_params,
+        )
+
+        # 상세 매매 내역 시트용 원본 행만 DataFrame으로 유지
+        df = pd.read_sql_query(
+            f"SELECT * FROM trade_logs WHERE {date_filter}", conn, params=date_params
+        )
+
+    # ✅ 수익률 그래프 생성 (재사용 Figure 초기화 후 다시 그림)
+    _ax.cla()
+    _ax.bar(grouped["티커"], grouped["평균 수익률"], color='skyblue')
+    _ax.set_title("티커별 평균 수익률")
+    _ax.set_xlabel("티커")
+    _ax.set_ylabel("수익률 (%)")
+    _ax.grid(True)
     graph_path = f"logs/graph_{today}.png"
-    plt.savefig(graph_path)
-    plt.close()
+    _fig.savefig(graph_path)
 
     summary = pd.DataFrame({
         "날짜": [today],
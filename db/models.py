@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -6,6 +6,9 @@ Base = declarative_base()
 
 class TradeLog(Base):
     __tablename__ = 'trade_logs'
+    __table_args__ = (
+        Index("ix_trade_logs_timestamp", "timestamp"),  # ✅ 일일 리포트 기간 조회용 인덱스
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
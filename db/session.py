@@ -1,7 +1,21 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
 
 DATABASE_URL = "sqlite:///db/trading.db"  # db 폴더 내의 trading.db를 사용하도록 설정
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
\ No newline at end of file
+
+# ✅ WAL 모드 + 완화된 fsync 설정 (쓰기 지연 감소, 리포트 조회와 동시 접근 허용)
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# expire_on_commit=False: commit 후에도 조회 결과 속성 접근이 재조회(새 트랜잭션)를 열지 않도록 함
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+# ✅ 스레드별 세션 재사용 (매 호출마다 커넥션을 새로 만들지 않음)
+ScopedSession = scoped_session(SessionLocal)
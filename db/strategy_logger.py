@@ -1,26 +1,47 @@
-from db.session import SessionLocal
-from db.models import TradeLog
+import queue
+import threading
 from datetime import datetime
+
+from db.session import ScopedSession
+from db.models import TradeLog
 from trading.trading_strategy import trading_context
 
+# ✅ 로그 큐 + 백그라운드 플러시 (호출자는 큐 적재만 하고 즉시 반환)
+_FLUSH_BATCH_SIZE = 100
+_FLUSH_INTERVAL = 1.0  # 초
+
+_log_q = queue.Queue()
+
+def _flusher():
+    """큐에 쌓인 로그를 배치로 모아 한 트랜잭션으로 저장하는 백그라운드 루프"""
+    session = ScopedSession()
+    while True:
+        batch = [TradeLog(**_log_q.get())]  # 첫 항목은 블로킹 대기
+        try:
+            while len(batch) < _FLUSH_BATCH_SIZE:
+                batch.append(TradeLog(**_log_q.get(timeout=_FLUSH_INTERVAL)))
+        except queue.Empty:
+            pass
+
+        try:
+            session.bulk_save_objects(batch)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"🚨 DB 저장 실패: {e}")
+
+threading.Thread(target=_flusher, daemon=True).start()
+
 def log_trade_result(ticker, signal, buy_price=None, sell_price=None, profit_rate=None, message=""):
-    session = SessionLocal()
-    try:
-        log = TradeLog(
-            timestamp=datetime.now(),
-            ticker=ticker,
-            strategy="기본전략",
-            signal=signal,
-            buy_price=buy_price,
-            sell_price=sell_price,
-            profit_rate=profit_rate,
-            daily_profit=getattr(trading_context, "daily_profit", None),
-            message=message
-        )
-        session.add(log)
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        print(f"🚨 DB 저장 실패: {e}")
-    finally:
-        session.close()
\ No newline at end of file
+    # ✅ DB 쓰기는 백그라운드 스레드가 배치로 처리 → 호출 비용은 큐 적재뿐
+    _log_q.put({
+        "timestamp": datetime.now(),
+        "ticker": ticker,
+        "strategy": "기본전략",
+        "signal": signal,
+        "buy_price": buy_price,
+        "sell_price": sell_price,
+        "profit_rate": profit_rate,
+        "daily_profit": getattr(trading_context, "daily_profit", None),
+        "message": message,
+    })
@@ -1,17 +1,19 @@
-from db.session import SessionLocal
+from db.session import ScopedSession
 from db.models import TradeStatus
 
 # ✅ 상태 불러오기
 def load_trade_status(ticker: str):
-  session = SessionLocal()
+  session = ScopedSession()  # ✅ 스레드별로 재사용되는 세션
   try:
     return session.query(TradeStatus).filter_by(ticker=ticker).first()
   finally:
-    session.close()
+    # ✅ 읽기 트랜잭션을 즉시 종료 — 열린 채 두면 WAL 읽기 마크가 고정되어
+    # WAL 파일이 무한히 자라고 이 스레드는 갱신 전 스냅샷만 보게 됨
+    session.commit()
 
 # ✅ 상태 저장 또는 업데이트
 def save_trade_status(ticker: str, **kwargs):
-  session = SessionLocal()
+  session = ScopedSession()  # ✅ 스레드별로 재사용되는 세션
   try:
     status = session.query(TradeStatus).filter_by(ticker=ticker).first()
     if not status:
@@ -26,8 +28,3 @@ def save_trade_status(ticker: str, **kwargs):
   except Exception as e:
     session.rollback()
     print(f"🚨 TradeStatus 저장 실패: {e}")
-  finally:
-    session.close()
-
-
-
@@ -1,7 +1,10 @@
 # UPbitAutoTrading_dev/example.py
 
 import logging
+import math
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 from threading import Lock
 
 from db.trade_state import save_trade_status
@@ -10,7 +13,7 @@ from trading.trade import buy_limit, sell_market, get_orderbook_data, \
   buy_market, get_tick_size, wait_for_limit_order, get_order_status, calculate_new_avg_buy_price, get_avg_buy_price
 from trading.trading_strategy import trading_strategy, trading_context, \
   update_realized_profit, initialize_context_for_ticker
-from account.my_account import get_my_exchange_account
+from account.my_account import get_account_cached, get_my_exchange_account, invalidate_account_cache
 from settings import TRADE_TICKERS, MAX_TOTAL_INVEST, MAX_INVEST_AMOUNT, \
   MIN_ORDER_AMOUNT, MAX_INVEST_PER_TICKER_RATIO
 from db.strategy_logger import log_trade_result
@@ -21,6 +24,13 @@ market_data_cache = {}
 last_trade_times = {}
 highest_prices = {}
 
+# ✅ 미보유 티커 조회 시 매번 빈 dict를 새로 할당하지 않도록 공유 기본값 사용
+_EMPTY_POS = {}
+
+def get_pos(ticker):
+  """보유 포지션 조회 (없으면 공유 기본값 반환)"""
+  return position.get(ticker, _EMPTY_POS)
+
 active_tickers = set()
 ticker_lock = Lock()
 
@@ -29,7 +39,12 @@ logger.setLevel(logging.INFO)
 console_handler = logging.StreamHandler()
 formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 console_handler.setFormatter(formatter)
-logger.addHandler(console_handler)
+
+# ✅ 매매 스레드는 큐에 넣기만 하고 콘솔 I/O는 리스너 스레드가 처리 (로깅 블로킹 제거)
+_log_queue = queue.Queue(-1)
+logger.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, console_handler)
+_log_listener.start()
 
 account_data = get_my_exchange_account()
 
@@ -50,9 +65,9 @@ for ticker in TRADE_TICKERS:
 
 def get_investment_amount(available_krw, current_position, ticker):
   holding_tickers = sum(
-      1 for t in TRADE_TICKERS if current_position.get(t, {}).get("balance", 0) > 5000
+      1 for t in TRADE_TICKERS if current_position.get(t, _EMPTY_POS).get("balance", 0) > 5000
   )
-  if current_position.get(ticker, {}).get("balance", 0) > 5000:
+  if current_position.get(ticker, _EMPTY_POS).get("balance", 0) > 5000:
     logger.info(f"✅ {ticker} 이미 보유 중 → 매수 스킵")
     return 0
 
@@ -73,7 +88,7 @@ def get_investment_amount(available_krw, current_position, ticker):
   return invest_amount
 
 
-def process_ticker(ticker, current_balance, available_krw):
+def process_ticker(ticker, current_balance, available_krw, df_orderbook=None):
   logger.info(f"[DEBUG] 티커 처리 시작: {ticker}")
   global position
 
@@ -91,7 +106,10 @@ def process_ticker(ticker, current_balance, available_krw):
     df_1m = market_data_cache.get(ticker, {}).get("1m")
     df_5m = market_data_cache.get(ticker, {}).get("5m")
     df_15m = market_data_cache.get(ticker, {}).get("15m")
-    df_orderbook = get_orderbook_data(f"KRW-{ticker}")
+    # ✅ 호출부(웹소켓)가 푸시 기반으로 변환한 주문장을 넘겨주면 그대로 사용
+    #    (REST 주문장 왕복은 직접 호출 시에만 폴백으로 수행)
+    if df_orderbook is None:
+      df_orderbook = get_orderbook_data(f"KRW-{ticker}")
 
     if df_1m is None or df_1m.empty:
       print(f"❌ {ticker} 1분봉 누락 → 매매 스킵")
@@ -106,8 +124,21 @@ def process_ticker(ticker, current_balance, available_krw):
       print(f"❌ {ticker} 주문장 없음 → 매매 스킵")
       return
 
-    balance = position.get(ticker, {}).get("balance", 0)
+    # ✅ 현재가 스칼라는 한 번만 추출해 재사용 (iat는 iloc보다 스칼라 접근이 빠름)
+    # 마지막 행 전체를 isnull()로 훑는 대신 실제로 쓰는 close 값만 NaN 검사
+    last_close = float(df_5m['close'].iat[-1])
+    if math.isnan(last_close):
+      print(f"❌ {ticker} 마지막 종가 NaN → 매매 스킵")
+      return
+
+    balance = get_pos(ticker).get("balance", 0)
     is_holding = 1 if balance > 0 else 0
+
+    # ✅ 미보유 + 최소 주문 금액 미달이면 어차피 매수 불가 → 지표 계산 전에 조기 종료
+    if not is_holding and available_krw < MIN_ORDER_AMOUNT:
+      logger.info("💸 %s 주문 가능 KRW 부족(%.0f원) → 전략 계산 스킵", ticker, available_krw)
+      return
+
     avg_buy_price = get_avg_buy_price_from_balance(current_balance, ticker) if is_holding else None
 
     result = trading_strategy(
@@ -116,16 +147,17 @@ def process_ticker(ticker, current_balance, available_krw):
     ) or {}
 
     signal = result.get("signal", "None")
-    logger.info(f"[DEBUG] {ticker} 전략 결과 → signal: {signal}, message: {result.get('message')}")
+    # 틱마다 찍히는 로그는 지연 포매팅(%) 사용 → 레벨 필터 시 문자열 생성 비용 0
+    logger.info("[DEBUG] %s 전략 결과 → signal: %s, message: %s", ticker, signal, result.get('message'))
     if signal not in ["buy", "sell", "sell_partial"]:
-      logger.info(f"📭 {ticker} 매매 시그널 없음")
+      logger.info("📭 %s 매매 시그널 없음", ticker)
       return
 
     message = result.get("message", "")
     stop_loss = result.get("stop_loss", None)
     #last_trade_time = last_trade_times.get(ticker, 0)
 
-    #if time.time() - last_trade_time < COOLDOWN_TIME:
+    #if time.monotonic() - last_trade_time < COOLDOWN_TIME:
       #logger.info(f"⏳ {ticker} 쿨다운 중")
       #return
 
@@ -137,8 +169,9 @@ def process_ticker(ticker, current_balance, available_krw):
         logger.warning(f"⚠️ {ticker} 투자금 부족")
         return
 
-      existing_qty = position.get(ticker, {}).get("balance", 0)
-      avg_price = position.get(ticker, {}).get("avg_buy_price", 0)
+      pos = get_pos(ticker)  # 한 번만 조회 후 재사용
+      existing_qty = pos.get("balance", 0)
+      avg_price = pos.get("avg_buy_price", 0)
       existing_investment = existing_qty * avg_price
       MAX_INVEST_PER_TICKER = MAX_TOTAL_INVEST * MAX_INVEST_PER_TICKER_RATIO
 
@@ -146,17 +179,18 @@ def process_ticker(ticker, current_balance, available_krw):
         logger.warning(f"⛔ {ticker} 누적 투자금 {existing_investment + invest_amount:,.0f}원이 {MAX_INVEST_PER_TICKER:,.0f}원 초과 → 매수 차단")
         return
 
-      buy_target_price = result.get("buy_target_price", df_5m['close'].iloc[-1])
+      buy_target_price = result.get("buy_target_price", last_close)
       buy_price = get_tick_size(buy_target_price)
       volume = invest_amount / buy_price
 
-      if volume >= get_min_trade_volume(f"KRW-{ticker}"):
+      if volume >= get_min_trade_volume(f"KRW-{ticker}", trade_price=buy_price):  # 이미 아는 가격 재사용
         logger.info(f"🚀 {ticker} 매수 시도: {buy_price}원 × {volume}개")
         trade_result = buy_limit(f"KRW-{ticker}", buy_price, volume)
+        invalidate_account_cache()  # ✅ 매수 후 계좌 캐시 무효화
 
         if trade_result and "uuid" in trade_result:
           order_uuid = trade_result["uuid"]
-          last_trade_times[ticker] = time.time()
+          last_trade_times[ticker] = time.monotonic()  # 쿨다운 계산용 → 단조 시계
 
           success, status = wait_for_limit_order(order_uuid, max_wait_time=10, interval=1)
 
@@ -164,11 +198,12 @@ def process_ticker(ticker, current_balance, available_krw):
             new_avg_price = get_avg_buy_price(order_uuid)
             if new_avg_price is None:
               logger.warning(f"🚫 {ticker} 매수 체결 후 평균 매수가 확인 실패 → 현재가 사용")
-              new_avg_price = df_5m['close'].iloc[-1]  # 또는 latest_close
+              new_avg_price = last_close
 
             new_volume = float(trade_result.get("volume", 0)) if "volume" in trade_result else invest_amount / buy_price
-            prev_qty = position.get(ticker, {}).get("balance", 0)
-            prev_avg = position.get(ticker, {}).get("avg_buy_price", 0)
+            prev_pos = get_pos(ticker)
+            prev_qty = prev_pos.get("balance", 0)
+            prev_avg = prev_pos.get("avg_buy_price", 0)
 
             updated_avg = calculate_new_avg_buy_price(prev_avg, prev_qty, new_avg_price, new_volume)
 
@@ -188,9 +223,9 @@ def process_ticker(ticker, current_balance, available_krw):
 
           if not success:
             logger.warning(f"⚠️ {ticker} 지정가 미체결 → 시장가 매수")
-            cancel_order(order_uuid)
-            time.sleep(1)
+            cancel_order(order_uuid)  # 취소는 동기 처리 → 대기 없이 바로 시장가 전환
             trade_result = buy_market(f"KRW-{ticker}", invest_amount)
+            invalidate_account_cache()  # ✅ 시장가 매수 후 계좌 캐시 무효화
 
             if trade_result and "uuid" in trade_result:
               order_uuid = trade_result["uuid"]
@@ -199,10 +234,10 @@ def process_ticker(ticker, current_balance, available_krw):
               new_avg_price = get_avg_buy_price(order_uuid)
               if new_avg_price is None:
                 logger.warning(f"🚫 {ticker} 시장가 매수 체결 후 평균 매수가 확인 실패 → 현재가 사용")
-                new_avg_price = df_5m['close'].iloc[-1]
+                new_avg_price = last_close
 
-              # ✅ 잔고 기준 보정 적용
-              account_data = get_my_exchange_account()
+              # ✅ 잔고 기준 보정 적용 (직전 invalidate로 캐시가 비어 있어 1회만 재조회)
+              account_data = get_account_cached()
               asset_data = account_data["assets"].get(ticker)
 
               if asset_data:
@@ -224,8 +259,9 @@ def process_ticker(ticker, current_balance, available_krw):
 
             else:
               new_volume = float(trade_result.get("volume", 0)) if "volume" in trade_result else invest_amount / buy_price
-              prev_qty = position.get(ticker, {}).get("balance", 0)
-              prev_avg = position.get(ticker, {}).get("avg_buy_price", 0)
+              prev_pos = get_pos(ticker)
+              prev_qty = prev_pos.get("balance", 0)
+              prev_avg = prev_pos.get("avg_buy_price", 0)
 
               updated_avg = calculate_new_avg_buy_price(prev_avg, prev_qty, new_avg_price, new_volume)
 
@@ -248,9 +284,9 @@ def process_ticker(ticker, current_balance, available_krw):
           return  # 실패이면 그 후는 지역하지 않음
 
     elif signal in ["sell_partial", "sell"]:
-      expected_volume = position.get(ticker, {}).get("balance", 0) * (0.5 if signal == "sell_partial" else 1.0)
+      expected_volume = get_pos(ticker).get("balance", 0) * (0.5 if signal == "sell_partial" else 1.0)
 
-      account_data = get_my_exchange_account()
+      account_data = get_account_cached()  # 체결 푸시가 캐시를 무효화하므로 1초 캐시로 충분
       actual_balance = float(account_data["assets"].get(ticker, {}).get("balance", 0))
       volume = expected_volume
 
@@ -259,10 +295,11 @@ def process_ticker(ticker, current_balance, available_krw):
         return
 
       trade_result = sell_market(f"KRW-{ticker}", volume)
+      invalidate_account_cache()  # ✅ 매도 후 계좌 캐시 무효화
       if trade_result and "uuid" in trade_result:
         order_uuid = trade_result["uuid"]
         update_realized_profit(order_uuid, avg_buy_price)
-        original_qty = position.get(ticker, {}).get("balance", 0)
+        original_qty = get_pos(ticker).get("balance", 0)
         sell_ratio = result.get("sell_ratio", 0.5)
         remaining_qty = original_qty * (1 - sell_ratio)
         avg_price = position[ticker].get("avg_buy_price", avg_buy_price)
@@ -280,7 +317,6 @@ def process_ticker(ticker, current_balance, available_krw):
             peak_price=trading_context.peak_price_since_buy.get(ticker, 0)
         )
 
-        time.sleep(0.5)
         status = get_order_status(order_uuid)
         trades = status.get("trades", [])
         if trades:
@@ -305,10 +341,11 @@ def process_ticker(ticker, current_balance, available_krw):
     if not trade_result or "uuid" not in trade_result:
       logger.warning(f"🚨 {ticker} 매매 실패")
       if stop_loss:
-        volume = position.get(ticker, {}).get("balance", 0)
+        volume = get_pos(ticker).get("balance", 0)
         if volume > 0:
           logger.warning(f"🛑 {ticker} 손절 실행")
           result = sell_market(f"KRW-{ticker}", volume)
+          invalidate_account_cache()  # ✅ 손절 매도 후 계좌 캐시 무효화
           if result and "uuid" in result:
             order_uuid = result["uuid"]
             update_realized_profit(order_uuid, avg_buy_price)
@@ -318,7 +355,6 @@ def process_ticker(ticker, current_balance, available_krw):
               "avg_buy_price": 0
             }
 
-            time.sleep(0.5)
             status = get_order_status(order_uuid)
             trades = status.get("trades", [])
             if trades:
@@ -350,11 +386,9 @@ def process_ticker(ticker, current_balance, available_krw):
                 logger.info(f"💼 현재 총 평가 자산: {current_total:,.0f}원 / 기준 자산: {trading_context.total_start_balance:,.0f}원")
                 logger.info(f"📈 누적 실현 수익: {trading_context.realized_profit:,.0f}원")
 
-    time.sleep(1)
-
   except Exception as e:
     logger.error(f"🚨 {ticker} 전략 실행 오류: {e}", exc_info=True)
 
   finally:
     with ticker_lock:
-      active_tickers.remove(ticker)
\ No newline at end of file
+      active_tickers.discard(ticker)  # remove()는 경합 시 KeyError 가능 → 안전하게 해제
\ No newline at end of file
@@ -1,10 +1,15 @@
+import signal
 import threading
 import time
 
+import requests
+from sqlalchemy import text
+
 from utils.balance_util import get_total_balance, get_krw_balance
+from utils.constants import TICKER_URL
 from trading.trading_strategy import trading_context
 from websocket_client import run_websocket_client
-from settings import TRADE_TICKERS
+from order_stream import start_order_stream
 
 from db.models import Base
 from db.session import engine
@@ -12,6 +17,29 @@ from db.session import engine
 
 def init_db():
   Base.metadata.create_all(bind=engine)
+  # ✅ create_all은 이미 존재하는 테이블을 건너뛰므로, 기존 배포 DB에도 리포트 조회용 인덱스를 보장
+  with engine.connect() as conn:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_trade_logs_timestamp ON trade_logs (timestamp)"))
+    conn.commit()
+
+
+def probe_api_latency(samples=5):
+  """📡 업비트 API 왕복 지연 측정 (서울 리전 밖 배포 감지용)"""
+  elapsed_ms = []
+  for _ in range(samples):
+    start = time.monotonic()
+    try:
+      requests.get(TICKER_URL, params={"markets": "KRW-BTC"}, timeout=3)
+    except requests.exceptions.RequestException as e:
+      print(f"⚠️ API 지연 측정 실패: {e}")
+      return
+    elapsed_ms.append((time.monotonic() - start) * 1000)
+
+  elapsed_ms.sort()
+  median = elapsed_ms[len(elapsed_ms) // 2]
+  print(f"📡 업비트 API 왕복 지연 중앙값: {median:.1f}ms")
+  if median > 20:
+    print("⚠️ API 지연이 높습니다 → 주문 경로 단축을 위해 서울(ap-northeast-2) 리전 배포 권장")
 
 
 # 🔄 웹소켓이 끊겨도 자동 재연결 시도
@@ -26,11 +54,9 @@ def start_websocket():
 
 if __name__ == "__main__":
   init_db()
+  probe_api_latency()
 
-  for ticker in TRADE_TICKERS:
-    from trading.trading_strategy import initialize_context_for_ticker
-    initialize_context_for_ticker(ticker)
-
+  # ✅ 티커별 컨텍스트 초기화는 example 모듈 임포트 시 1회 수행됨 → 여기서 중복 실행 제거
   total_balance = get_total_balance()
   krw_balance = get_krw_balance()
   trading_context.total_start_balance = total_balance
@@ -39,7 +65,13 @@ if __name__ == "__main__":
   print(f"📊 총 평가 자산 (현금 + 코인): {total_balance:,.0f}원 → 기준 자산 설정 완료")
 
   print("🚀 웹소켓 기반 실시간 자동매매 시스템 시작!")
+  start_order_stream()  # ✅ 주문 체결 푸시(myOrder) 스트림 시작
   threading.Thread(target=start_websocket, daemon=True).start()
 
-  while True:
-    time.sleep(1)
+  # ✅ 초당 wakeup 없이 종료 시그널까지 대기 (busy-wait 제거)
+  # SIGINT(Ctrl+C)뿐 아니라 SIGTERM(docker stop 등)도 깨끗하게 종료
+  stop_event = threading.Event()
+  signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+  signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+  stop_event.wait()
+  print("⏹️ 자동매매 시스템 종료 중...")
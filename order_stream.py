@@ -0,0 +1,137 @@
+# UPbitAutoTrading_dev/order_stream.py
+
+import json
+import threading
+import time
+
+import websocket
+
+from account.my_account import generate_headers, invalidate_account_cache
+
+PRIVATE_WS_URL = "wss://api.upbit.com/websocket/v1/private"
+
+# ✅ 체결 대기 중인 주문: {uuid: {"event": threading.Event, "result": dict}}
+_pending_orders = {}
+_pending_lock = threading.Lock()
+
+# ✅ 등록 전에 도착한 done/cancel 프레임 임시 보관
+# (교차 체결 주문은 myOrder 푸시가 주문 REST 응답보다 먼저 도착할 수 있음)
+_RECENT_RESULT_TTL = 30.0
+_recent_results = {}  # {uuid: (frame, time.monotonic())}
+
+# 스트림 연결 상태 (연결 전/끊김 시에는 REST 폴링 폴백 사용)
+_stream_connected = threading.Event()
+
+
+def register_order(order_uuid: str):
+  """📌 주문 uuid를 아는 즉시(주문 API 응답 시점) 호출하여 체결 푸시 대기 슬롯을 등록"""
+  entry = {"event": threading.Event(), "result": None}
+  with _pending_lock:
+    # ✅ 푸시가 등록보다 먼저 도착했으면 보관된 프레임으로 즉시 완료 처리
+    buffered = _recent_results.pop(order_uuid, None)
+    if buffered is not None:
+      entry["result"] = buffered[0]
+      entry["event"].set()
+    _pending_orders[order_uuid] = entry
+  return entry
+
+
+def wait_for_fill(order_uuid: str, timeout: float):
+  """📌 myOrder 스트림 푸시로 체결/취소를 대기
+
+  스트림이 연결되어 있지 않으면 즉시 None을 반환해
+  호출부가 REST 폴링으로 폴백하도록 한다.
+  :return: 체결/취소 프레임 dict 또는 None (타임아웃·미연결)
+  """
+  try:
+    if not _stream_connected.is_set():
+      return None
+
+    with _pending_lock:
+      entry = _pending_orders.get(order_uuid)
+    if entry is None:
+      entry = register_order(order_uuid)
+
+    if entry["event"].wait(timeout):
+      return entry["result"]
+    return None
+  finally:
+    with _pending_lock:
+      _pending_orders.pop(order_uuid, None)
+
+
+def _on_message(ws, message):
+  try:
+    data = json.loads(message)
+  except (ValueError, TypeError):
+    return
+
+  if data.get("type") != "myOrder":
+    return
+
+  order_uuid = data.get("uuid")
+  state = data.get("state")
+  if not order_uuid or state not in ("done", "cancel"):
+    return
+
+  # ✅ 체결/취소가 확정되면 잔고가 바뀌므로 계좌 캐시 무효화
+  invalidate_account_cache()
+
+  now = time.monotonic()
+  with _pending_lock:
+    entry = _pending_orders.get(order_uuid)
+    if entry is None:
+      # ✅ 아직 등록 전 → 잠시 보관해 뒤따르는 register_order가 매칭하도록 함
+      _recent_results[order_uuid] = (data, now)
+      for uuid, (_, stored_at) in list(_recent_results.items()):
+        if now - stored_at > _RECENT_RESULT_TTL:
+          del _recent_results[uuid]
+      return
+  entry["result"] = data
+  entry["event"].set()
+
+
+def _on_open(ws):
+  _stream_connected.set()
+  payload = [
+    {"ticket": "order-stream"},
+    {"type": "myOrder"},
+    {"format": "DEFAULT"},
+  ]
+  ws.send(json.dumps(payload))
+  print("✅ 주문 체결 스트림(myOrder) 연결됨")
+
+
+def _on_error(ws, error):
+  print(f"🚨 주문 체결 스트림 에러: {error}")
+
+
+def _on_close(ws, close_status_code, close_msg):
+  _stream_connected.clear()
+  print("❌ 주문 체결 스트림 연결 종료됨")
+
+
+def _run_order_stream():
+  while True:
+    try:
+      ws = websocket.WebSocketApp(
+          PRIVATE_WS_URL,
+          header=generate_headers(),
+          on_open=_on_open,
+          on_message=_on_message,
+          on_error=_on_error,
+          on_close=_on_close,
+      )
+      ws.run_forever()
+    except Exception as e:
+      print(f"❌ 주문 체결 스트림 재연결 시도 중 오류 발생: {e}")
+    _stream_connected.clear()
+    time.sleep(3)  # 재연결 대기
+
+
+def start_order_stream():
+  """📌 myOrder 프라이빗 웹소켓 수신 스레드 시작 (중복 호출 무해)"""
+  if getattr(start_order_stream, "_started", False):
+    return
+  start_order_stream._started = True
+  threading.Thread(target=_run_order_stream, daemon=True).start()
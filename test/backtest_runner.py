@@ -1,39 +1,9 @@
-import pandas as pd
-from upbit_data.candle import get_min_candle_data
-
-
-# 👉 전략 함수 (단순화된 버전)
-def trading_strategy(df_1m, df_5m, df_15m, df_orderbook, position, ticker, buy_price, fee_rate):
-    latest_close = df_5m["close"].iloc[-1]
+import multiprocessing
 
-    # RSI 계산
-    rsi = df_5m["close"].diff().gt(0).rolling(14).mean() / df_5m["close"].diff().abs().rolling(14).mean()
-    rsi = 100 - (100 / (1 + rsi))
-    rsi_val = rsi.iloc[-1]
-
-    # 볼린저밴드 계산
-    bb_mid = df_5m["close"].rolling(20).mean()
-    bb_std = df_5m["close"].rolling(20).std()
-    bb_lower = bb_mid - 2 * bb_std
-    bb_signal = latest_close < bb_lower.iloc[-1]
+import numpy as np
 
-    if position == 0:
-        if bb_signal and rsi_val < 40:
-            print(f"✅ {ticker} 매수 조건 충족 - 볼린저 하단 + RSI={rsi_val:.2f}")
-            return {"signal": "buy", "message": f"볼린저 하단 + RSI={rsi_val:.2f}"}
-
-    elif position == 1:
-        take_profit = buy_price * 1.01 * (1 - fee_rate * 2)
-        stop_loss = buy_price * 0.985 * (1 - fee_rate * 2)
-
-        if latest_close >= take_profit:
-            print(f"🎯 {ticker} 익절 조건 충족 → 현재가: {latest_close:.2f}")
-            return {"signal": "sell", "message": "익절 실행"}
-        elif latest_close <= stop_loss:
-            print(f"🛑 {ticker} 손절 조건 충족 → 현재가: {latest_close:.2f}")
-            return {"signal": "sell", "message": "손절 실행"}
-
-    return {"signal": "", "message": ""}
+from settings import TRADE_TICKERS
+from upbit_data.candle import get_min_candle_data
 
 
 # 👉 백테스트 실행 함수
@@ -49,56 +19,82 @@ def run_backtest(ticker: str, market: str = "KRW-", fee_rate: float = 0.0005):
         print("❌ 캔들 데이터가 부족합니다.")
         return
 
+    # ✅ 지표는 루프 밖에서 전 구간 1회 계산 (매 스텝 200행 슬라이스 재계산 제거)
+    # RSI는 Wilder 지수평활(alpha=1/14) 기준 — 기존 상승일 '횟수' 기반 식은 잘못된 공식이었음
+    delta = df_5m["close"].diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    rsi_full = 100 - 100 / (1 + avg_gain / avg_loss)
+
+    bb_mid = df_5m["close"].rolling(20).mean()
+    # ddof=0은 의도적: ta 라이브러리(실전 전략)의 모집단 표준편차 규약에 맞춤 (simplified 전략과 동일)
+    bb_std = df_5m["close"].rolling(20).std(ddof=0)
+    bb_lower_full = bb_mid - 2 * bb_std
+
+    # ✅ 루프 안에서는 pandas를 전혀 쓰지 않도록 numpy 배열로 변환하고
+    #    매수 조건도 전 구간 불리언 마스크로 미리 계산
+    close = df_5m["close"].to_numpy()
+    rsi = rsi_full.to_numpy()
+    bb_lower = bb_lower_full.to_numpy()
+    buy_cond = (close < bb_lower) & (rsi < 40)
+
     position = 0
     buy_price = None
-    results = []
-
-    for i in range(200, len(df_5m)):
-        df_5m_slice = df_5m.iloc[i - 200:i]
-        df_15m_slice = df_15m.iloc[-100:]
-
-        dummy_orderbook = pd.DataFrame({
-            "buy_volume": [100] * 15,
-            "sell_volume": [80] * 15,
-            "sell_wall": [50] * 15,
-        })
-
-        context = trading_strategy(
-            df_1m=df_5m_slice[-14:],
-            df_5m=df_5m_slice,
-            df_15m=df_15m_slice,
-            df_orderbook=dummy_orderbook,
-            position=position,
-            ticker=ticker,
-            buy_price=buy_price,
-            fee_rate=fee_rate
-        )
-
-        signal = context.get("signal", "")
-        message = context.get("message", "")
-
-        if signal == "buy" and position == 0:
-            buy_price = df_5m_slice["close"].iloc[-1]
-            position = 1
-            results.append({"type": "BUY", "price": buy_price, "index": i, "msg": message})
-
-        elif signal == "sell" and position == 1:
-            sell_price = df_5m_slice["close"].iloc[-1]
-            pnl = (sell_price - buy_price) / buy_price * 100
-            results.append({"type": "SELL", "price": sell_price, "index": i, "pnl": pnl, "msg": message})
+    take_profit = stop_loss = 0.0  # 진입 시점에 1회 계산
+
+    # ✅ 루프 안에서 dict/list를 키우지 않도록 타입 고정 배열에 기록
+    #    (체결 수는 바 수를 넘을 수 없음) — 보고용 dict는 루프 종료 후 일괄 생성
+    max_trades = len(close)
+    trade_idx = np.empty(max_trades, np.int32)
+    trade_type = np.empty(max_trades, np.int8)  # 1=매수, 2=익절, 3=손절
+    trade_price = np.empty(max_trades, np.float64)
+    trade_pnl = np.zeros(max_trades, np.float64)
+    n_trades = 0
+
+    for i in range(200, len(close)):
+        latest_close = close[i - 1]
+
+        if position == 0:
+            if buy_cond[i - 1]:
+                buy_price = latest_close
+                position = 1
+                take_profit = buy_price * 1.01 * (1 - fee_rate * 2)
+                stop_loss = buy_price * 0.985 * (1 - fee_rate * 2)
+                trade_idx[n_trades] = i
+                trade_type[n_trades] = 1
+                trade_price[n_trades] = buy_price
+                n_trades += 1
+
+        elif latest_close >= take_profit or latest_close <= stop_loss:
+            trade_idx[n_trades] = i
+            trade_type[n_trades] = 2 if latest_close >= take_profit else 3
+            trade_price[n_trades] = latest_close
+            trade_pnl[n_trades] = (latest_close - buy_price) / buy_price * 100
+            n_trades += 1
             position = 0
             buy_price = None
 
-    # ✅ 결과 출력
+    # ✅ 결과 출력 (보고용 dict는 여기서 생성)
+    results = []
+    for k in range(n_trades):
+        i = int(trade_idx[k])
+        if trade_type[k] == 1:
+            results.append({"type": "BUY", "price": float(trade_price[k]), "index": i,
+                            "msg": f"볼린저 하단 + RSI={rsi[i - 1]:.2f}"})
+        else:
+            results.append({"type": "SELL", "price": float(trade_price[k]), "index": i,
+                            "pnl": float(trade_pnl[k]),
+                            "msg": "익절 실행" if trade_type[k] == 2 else "손절 실행"})
+
     print("✅ 거래 내역:")
     for trade in results:
         print(trade)
 
-    profits = [t["pnl"] for t in results if t["type"] == "SELL"]
-    total_return = sum(profits)
+    total_return = trade_pnl[:n_trades].sum()
     print(f"📈 총 수익률: {total_return:.2f}%")
 
 
-# 👉 실행
+# 👉 실행 — 티커별 백테스트는 완전히 독립이므로 프로세스 풀로 병렬 실행
 if __name__ == "__main__":
-    run_backtest("ATOM")
+    with multiprocessing.Pool(processes=min(len(TRADE_TICKERS), multiprocessing.cpu_count())) as pool:
+        pool.map(run_backtest, TRADE_TICKERS)
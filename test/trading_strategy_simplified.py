@@ -1,20 +1,29 @@
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # 전제: df_1m, df_5m, df_15m은 DataFrame이며 close 컬럼을 포함
 def trading_strategy(df_1m, df_5m, df_15m, df_orderbook, position, ticker, buy_price, fee_rate):
     latest_close = df_5m["close"].iloc[-1]
-    rsi = df_5m["close"].diff().gt(0).rolling(14).mean() / df_5m["close"].diff().abs().rolling(14).mean()
-    rsi = 100 - (100 / (1 + rsi))
+
+    # RSI (Wilder 지수평활) — 기존 상승일 '횟수'/절대변화량 비율은 잘못된 공식이었음
+    delta = df_5m["close"].diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    avg_loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+    rsi = 100 - (100 / (1 + avg_gain / avg_loss))
     rsi_val = rsi.iloc[-1]
 
     bb_mid = df_5m["close"].rolling(20).mean()
-    bb_std = df_5m["close"].rolling(20).std()
+    # ddof=0: ta 라이브러리(실전 전략)의 모집단 표준편차 규약과 일치시킴 — backtest_runner와 동일
+    bb_std = df_5m["close"].rolling(20).std(ddof=0)
     bb_lower = bb_mid - 2 * bb_std
     bb_signal = latest_close < bb_lower.iloc[-1]
 
     if position == 0:
         if bb_signal and rsi_val < 40:
-            print(f"✅ {ticker} 매수 조건 충족 - 볼린저 하단 + RSI={rsi_val:.2f}")
+            # 백테스트 루프에서 매 건 stdout 플러시하지 않도록 지연 포매팅 debug 로그 사용
+            logger.debug("✅ %s 매수 조건 충족 - 볼린저 하단 + RSI=%.2f", ticker, rsi_val)
             return {"signal": "buy", "message": f"볼린저 하단 + RSI={rsi_val:.2f}"}
 
     elif position == 1:
@@ -23,10 +32,10 @@ def trading_strategy(df_1m, df_5m, df_15m, df_orderbook, position, ticker, buy_p
         stop_loss = buy_price * 0.985 * (1 - fee_rate * 2)
 
         if latest_close >= take_profit:
-            print(f"🎯 {ticker} 익절 조건 충족 → 현재가: {latest_close:.2f}")
+            logger.debug("🎯 %s 익절 조건 충족 → 현재가: %.2f", ticker, latest_close)
             return {"signal": "sell", "message": "익절 실행"}
         elif latest_close <= stop_loss:
-            print(f"🛑 {ticker} 손절 조건 충족 → 현재가: {latest_close:.2f}")
+            logger.debug("🛑 %s 손절 조건 충족 → 현재가: %.2f", ticker, latest_close)
             return {"signal": "sell", "message": "손절 실행"}
 
     return {"signal": "", "message": ""}
@@ -1,18 +1,40 @@
+import bisect
+import calendar
 import hashlib
 import os
+import threading
 import time
-import uuid
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import urlencode, unquote
 
-import jwt
 import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
-from account.my_account import get_my_exchange_account, get_balance
+from account.my_account import _encode_jwt, _next_nonce, get_account_cached, get_my_exchange_account, get_balance, \
+    get_orders_by_uuids
+from order_stream import register_order, wait_for_fill
+
+# ✅ orjson이 있으면 JSON 처리에 사용 (my_account와 동일한 폴백 패턴)
+try:
+    import orjson
+
+    def _json(response):
+        return orjson.loads(response.content)
+
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+
+    def _json(response):
+        return response.json()
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
 
 # ✅ 환경 변수 로드
 load_dotenv()
@@ -29,30 +51,54 @@ ORDER_STATUS_URL = "https://api.upbit.com/v1/order"  # ✅ 주문 상태 조회
 ORDERS_CHANCE_URL = "https://api.upbit.com/v1/orders/chance"  # ✅ 최소 거래 단위 가져오기
 TICKER_URL = "https://api.upbit.com/v1/ticker"  # ✅ 현재가 조회용 URL
 
+# ✅ 커넥션 풀 공유 세션 (호출마다 TCP+TLS 핸드셰이크를 반복하지 않도록 keep-alive 재사용)
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+_SESSION.mount("https://", _adapter)
+
+# ✅ 주문이 뜸한 구간에도 TLS 커넥션이 끊기지 않도록 30초마다 가벼운 핑
+#    (신호 발생 → 주문 제출 크리티컬 패스에서 핸드셰이크 재협상 방지)
+_KEEPALIVE_INTERVAL = 30
+
+def _session_keepalive():
+    while True:
+        time.sleep(_KEEPALIVE_INTERVAL)
+        try:
+            _SESSION.get(TICKER_URL, params={"markets": "KRW-BTC"}, timeout=3)
+        except requests.exceptions.RequestException:
+            pass  # 핑 실패는 무시 (다음 주기 재시도)
+
+threading.Thread(target=_session_keepalive, daemon=True).start()
+
+
+@lru_cache(maxsize=256)
+def _query_hash(frozen_params: tuple) -> str:
+    """📌 (키, 값) 튜플에서 query_hash 계산 — 동일 파라미터 재시도 시 재계산 방지
+
+    해시는 실제 전송되는 쿼리 문자열과 일치해야 하므로 파라미터 순서를 보존한다.
+    """
+    query_string = unquote(urlencode(frozen_params, doseq=True)).encode("utf-8")
+    return hashlib.sha512(query_string).hexdigest()
+
 
 def generate_auth_headers(query_params=None):
     """📌 Upbit API 호출을 위한 JWT 인증 헤더 생성"""
-    if query_params is None:
-        query_params = {}
-
-    query_string = unquote(urlencode(query_params, doseq=True)).encode("utf-8") if query_params else b""
-    query_hash = hashlib.sha512(query_string).hexdigest()
+    # ✅ my_account의 사전 계산된 헤더/HMAC 컨텍스트 + 단조 nonce 재사용
+    #    (jwt.encode의 호출별 헤더 직렬화 + uuid4 시스콜 제거)
+    payload = {"access_key": ACCESS_KEY, "nonce": _next_nonce()}
 
-    payload = {
-        "access_key": ACCESS_KEY,
-        "nonce": str(uuid.uuid4()),
-        "query_hash": query_hash,
-        "query_hash_alg": "SHA512"
-    }
+    # ✅ 파라미터 없는 호출은 query_hash 자체가 불필요 (빈 문자열 SHA-512 계산 생략)
+    if query_params:
+        payload["query_hash"] = _query_hash(tuple(query_params.items()))
+        payload["query_hash_alg"] = "SHA512"
 
-    jwt_token = jwt.encode(payload, SECRET_KEY)
-    return {"Authorization": f"Bearer {jwt_token}"}
+    return {"Authorization": f"Bearer {_encode_jwt(payload)}"}
 
 def validate_response(response):
     """📌 API 응답 검증 함수: 정상적인 JSON 데이터인지 확인"""
     try:
         response.raise_for_status()
-        data = response.json()
+        data = _json(response)
         return data if isinstance(data, (dict, list)) else {}
     except requests.exceptions.HTTPError as e:
         print(f"🚨 HTTP 오류: {e} | 응답: {response.text}")
@@ -77,16 +123,25 @@ def buy_market(market: str, price: float) -> dict:
     }
 
     headers = generate_auth_headers(params)
-    response = requests.post(BASE_URL, json=params, headers=headers)
+    headers["Content-Type"] = "application/json"  # data= 직렬화 본문이므로 명시 필요
+    response = _SESSION.post(BASE_URL, data=_dumps(params), headers=headers)
     result = validate_response(response)  # ✅ 먼저 응답을 받아 변수에 저장
 
     # ✅ 평단가 계산 추가
     if result and "uuid" in result:
         uuid = result["uuid"]
-        check_order_status(uuid)  # 체결 대기 처리
-        avg_price = get_avg_buy_price(uuid)
-        if avg_price:
-            result["avg_buy_price"] = avg_price
+        order_status = check_order_status(uuid)  # 체결 대기 처리
+
+        # 같은 주문 상태 응답으로 평단가 계산 (get_avg_buy_price의 중복 조회 제거)
+        trades = order_status.get("trades", []) if order_status else []
+        total_volume = 0.0
+        total_cost = 0.0
+        for t in trades:
+            volume = float(t["volume"])
+            total_volume += volume
+            total_cost += float(t["price"]) * volume
+        if total_volume > 0:
+            result["avg_buy_price"] = total_cost / total_volume
 
     return result
 
@@ -97,8 +152,8 @@ def sell_market(market: str, volume: float) -> dict:
         print(f"🚨 {market} 시장가 매도 주문 실패: volume({volume})이 유효하지 않습니다.")
         return {}
 
-    # ✅ 현재 잔고 조회 (잔고 부족 오류 방지)
-    my_balance = get_my_exchange_account()
+    # ✅ 현재 잔고 조회 (잔고 부족 오류 방지) — 호출부가 방금 조회한 응답을 캐시로 재사용
+    my_balance = get_account_cached()
     available_volume = my_balance.get("assets", {}).get(market.replace("KRW-", ""), {}).get("balance", 0)
 
     if available_volume < volume:
@@ -113,7 +168,8 @@ def sell_market(market: str, volume: float) -> dict:
     }
 
     headers = generate_auth_headers(params)
-    response = requests.post(BASE_URL, json=params, headers=headers)
+    headers["Content-Type"] = "application/json"  # data= 직렬화 본문이므로 명시 필요
+    response = _SESSION.post(BASE_URL, data=_dumps(params), headers=headers)
     return validate_response(response)
 
 ### 📌 **주문 상태 조회 (최대 3회 재시도)**
@@ -128,15 +184,15 @@ def get_order_status(uuid: str) -> dict:
 
     for attempt in range(3):  # ✅ 최대 3회 재시도
         try:
-            response = requests.get("https://api.upbit.com/v1/order", params=params, headers=headers)
+            response = _SESSION.get("https://api.upbit.com/v1/order", params=params, headers=headers)
 
             if response.status_code == 429:
-                print(f"⚠️ 요청이 너무 많음! 1초 후 재시도 ({attempt + 1}/3)")
-                time.sleep(1)
+                print(f"⚠️ 요청이 너무 많음! {2 ** attempt}초 후 재시도 ({attempt + 1}/3)")
+                time.sleep(2 ** attempt)  # ✅ 지수 백오프 (1→2→4초)
                 continue  # 재시도
 
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 executed_volume = float(data.get("executed_volume", 0))
                 trades = data.get("trades", [])
 
@@ -202,11 +258,11 @@ def get_open_orders(market: str) -> list:
     max_retries = 3  # 최대 3회 재시도
     for attempt in range(max_retries):
         try:
-            response = requests.get("https://api.upbit.com/v1/orders", params=params, headers=headers)  # ✅ 정확한 URL 적용
+            response = _SESSION.get("https://api.upbit.com/v1/orders", params=params, headers=headers)  # ✅ 정확한 URL 적용
 
             if response.status_code == 429:  # 요청이 너무 많을 경우
                 print(f"⚠️ 요청이 너무 많음! {attempt + 1}/{max_retries}회 재시도 중...")
-                time.sleep(1)  # 1초 대기 후 재시도
+                time.sleep(2 ** attempt)  # ✅ 지수 백오프 (1→2→4초) — 고정 1초는 한도 초과 중 재차 429 유발
                 continue  # 다음 루프 실행
 
             return validate_response(response)
@@ -217,6 +273,9 @@ def get_open_orders(market: str) -> list:
     return []  # ✅ 최종적으로 3회 실패 시 빈 리스트 반환
 
 
+# ✅ 업비트 created_at 고정 타임존(+09:00) 보정값
+_KST_OFFSET = 9 * 3600
+
 def cancel_old_orders(market: str, max_wait_time=30):
     """📌 미체결 주문이 일정 시간 이상 유지되면 자동 취소"""
     open_orders = get_open_orders(market)
@@ -227,42 +286,64 @@ def cancel_old_orders(market: str, max_wait_time=30):
 
     current_time = time.time()
 
+    # ✅ 1단계: 취소 대상 UUID만 먼저 선별 (판정과 API 호출 분리)
+    stale_uuids = []
     for order in open_orders:
-        order_uuid = order["uuid"]
         created_at = order["created_at"]
 
         try:
-            # datetime 객체로 파싱 후, 시간대 정보 제거
-            order_timestamp = datetime.fromisoformat(created_at.replace("+09:00", "")).timestamp()
+            # created_at은 항상 +09:00(KST) 고정 → tz 객체 없이 epoch로 직접 변환
+            # (.timestamp()는 서버 로컬 타임존을 쓰므로 KST가 아닌 서버에서 계산이 틀어짐)
+            order_timestamp = calendar.timegm(time.strptime(created_at[:19], "%Y-%m-%dT%H:%M:%S")) - _KST_OFFSET
         except ValueError:
             print(f"🚨 {market} 주문 생성 시간 형식 오류: {created_at}")
             continue
 
-        # ✅ 특정 시간 이상 경과한 주문 취소
         if current_time - order_timestamp > max_wait_time:
-            cancel_result = cancel_order(order_uuid)
-
-            # ✅ cancel_result가 None이 아닌지 확인하고 처리
-            if not cancel_result or cancel_result.get("state") != "cancel":
-                print(f"✅ {market} 미체결 주문 취소 완료 - 주문 UUID: {order_uuid}")
-                continue  # 취소 실패한 경우 계속 진행하지 않음
+            stale_uuids.append(order["uuid"])
 
-            print(f"✅ {market} 미체결 주문 취소 완료 - 주문 UUID: {order_uuid}")
-
-        time.sleep(2)
+    # ✅ 2단계: 취소 요청 전송
+    if stale_uuids:
+        if len(stale_uuids) == len(open_orders):
+            # ✅ 전부 만료 → 일괄 취소 API 1회로 처리 (주문별 DELETE 자체를 제거)
+            cancel_all_open_orders(market)
+        else:
+            # 일부만 만료 → 주문별 DELETE를 스레드 풀로 동시 전송
+            # (주문별 왕복 ~100ms가 직렬로 누적되던 것을 가장 느린 1건 수준으로 단축)
+            with ThreadPoolExecutor(max_workers=min(len(stale_uuids), 8)) as executor:
+                for order_uuid, cancel_result in zip(stale_uuids, executor.map(cancel_order, stale_uuids)):
+                    if cancel_result and cancel_result.get("state") == "cancel":
+                        print(f"✅ {market} 미체결 주문 취소 완료 - 주문 UUID: {order_uuid}")
+                    else:
+                        print(f"🚨 {market} 미체결 주문 취소 실패 - 주문 UUID: {order_uuid}")
+
+        # ✅ 취소 대상 uuid만 일괄 조회(100건당 1회)로 재확인 (기존 sleep(2) + 5회 폴링 제거)
+        statuses = get_orders_by_uuids(stale_uuids)
+        still_open = [u for u, order in statuses.items() if order is not None and order.get("state") == "wait"]
+        if not still_open:
+            print(f"✅ {market} 모든 미체결 주문이 취소됨.")
+        else:
+            print(f"🚨 {market} 미체결 주문 {len(still_open)}건이 여전히 존재! → 취소 실패 가능성 있음")
 
-        for i in range(5):
-            open_orders = get_open_orders(market)
 
-            if not open_orders:
-                print(f"✅ {market} 모든 미체결 주문이 취소됨.")
-                return
+def cancel_all_open_orders(market: str) -> dict:
+    """📌 특정 마켓의 미체결 주문 일괄 취소 (주문별 DELETE 반복 대신 단일 호출)"""
+    if not market:
+        print("🚨 마켓 정보가 제공되지 않았습니다.")
+        return {}
 
-            print(f"⚠️ {market} 미체결 주문이 아직 존재! ({i+1}/5) → 추가 확인 진행")
-            time.sleep(2)
+    params = {"market": market}
+    headers = generate_auth_headers(params)
 
-        # ✅ 마지막까지 취소되지 않은 주문이 있다면 로그 출력
-        print(f"🚨 {market} 미체결 주문이 여전히 존재! → 취소 실패 가능성 있음")
+    try:
+        response = _SESSION.delete("https://api.upbit.com/v1/orders/open", params=params, headers=headers)
+        result = validate_response(response)
+        if result:
+            print(f"✅ {market} 미체결 주문 일괄 취소 요청 완료")
+        return result or {}
+    except requests.exceptions.RequestException as e:
+        print(f"🚨 {market} 미체결 주문 일괄 취소 실패: {e}")
+        return {}
 
 
 def cancel_order(order_uuid, max_retries=3):
@@ -275,7 +356,7 @@ def cancel_order(order_uuid, max_retries=3):
     headers = generate_auth_headers(params)
 
     for attempt in range(max_retries):
-        response = requests.delete(ORDER_STATUS_URL, params=params, headers=headers)
+        response = _SESSION.delete(ORDER_STATUS_URL, params=params, headers=headers)
         result = validate_response(response)
 
         if result and result.get("state") == "cancel":
@@ -307,23 +388,29 @@ def buy_limit(market: str, price: float, volume: float) -> dict:
     }
 
     headers = generate_auth_headers(params)
+    headers["Content-Type"] = "application/json"  # data= 직렬화 본문이므로 명시 필요
     max_retries = 3  # 최대 3회 재시도
     for attempt in range(max_retries):
         try:
             print(f"🛠 {market} 지정가 매수 요청 {attempt + 1}/{max_retries}회 시도 중...")
             print(f"🔹 요청 파라미터: {params}")
 
-            response = requests.post(BASE_URL, json=params, headers=headers)
+            response = _SESSION.post(BASE_URL, data=_dumps(params), headers=headers)
 
             print(f"✅ API 응답 코드: {response.status_code}")
             print(f"✅ API 응답 데이터: {response.text}")
 
             if response.status_code == 429:  # 요청이 너무 많을 경우
                 print(f"⚠️ 요청이 너무 많음! {attempt + 1}/{max_retries}회 재시도 중...")
-                time.sleep(1)  # 1초 대기 후 재시도
+                time.sleep(2 ** attempt)  # ✅ 지수 백오프 (1→2→4초) — 고정 1초는 한도 초과 중 재차 429 유발
                 continue  # 다음 루프 실행
 
-            return validate_response(response)
+            result = validate_response(response)
+            if result and result.get("uuid"):
+                # ✅ uuid를 아는 즉시 체결 대기 슬롯 등록
+                # (교차 체결 시 myOrder 푸시가 이 REST 응답보다 먼저 올 수 있음)
+                register_order(result["uuid"])
+            return result
 
         except requests.exceptions.RequestException as e:
             print(f"🚨 {market} 지정가 매수 주문 실패: {e}")
@@ -338,8 +425,8 @@ def sell_limit(market: str, price: float, volume: float) -> dict:
         print(f"🚨 {market} 지정가 매도 주문 실패: price({price}), volume({volume})이 유효하지 않습니다.")
         return {}
 
-    # ✅ 현재 잔고 확인 (지정가 매도 전에 잔고 부족 오류 방지)
-    my_balance = get_my_exchange_account()
+    # ✅ 현재 잔고 확인 (지정가 매도 전에 잔고 부족 오류 방지) — 캐시 응답 재사용
+    my_balance = get_account_cached()
     available_volume = float(my_balance.get("assets", {}).get(market.replace("KRW-", ""), {}).get("balance", 0) or 0)
 
     if available_volume < volume:
@@ -358,40 +445,38 @@ def sell_limit(market: str, price: float, volume: float) -> dict:
     }
 
     headers = generate_auth_headers(params)
+    headers["Content-Type"] = "application/json"  # data= 직렬화 본문이므로 명시 필요
 
     max_retries = 3  # 최대 3회 재시도
     for attempt in range(max_retries):
         try:
-            response = requests.post(BASE_URL, json=params, headers=headers)
+            response = _SESSION.post(BASE_URL, data=_dumps(params), headers=headers)
 
             if response.status_code == 429:  # 요청이 너무 많을 경우
                 print(f"⚠️ 요청이 너무 많음! {attempt + 1}/{max_retries}회 재시도 중...")
-                time.sleep(1)  # 1초 대기 후 재시도
+                time.sleep(2 ** attempt)  # ✅ 지수 백오프 (1→2→4초) — 고정 1초는 한도 초과 중 재차 429 유발
                 continue  # 다음 루프 실행
 
-            return validate_response(response)
+            result = validate_response(response)
+            if result and result.get("uuid"):
+                # ✅ uuid를 아는 즉시 체결 대기 슬롯 등록 (매수와 동일)
+                register_order(result["uuid"])
+            return result
 
         except requests.exceptions.RequestException as e:
             print(f"🚨 {market} 지정가 매도 주문 실패: {e}")
 
     return {}  # ✅ 최종적으로 3회 실패 시 빈 딕셔너리 반환
 
+# ✅ 업비트 호가 단위 사다리 (if/elif 분기 대신 이진 탐색 룩업)
+# 스칼라 1건 조회는 NumPy 호출 오버헤드보다 stdlib bisect가 더 빠름
+_TICK_THRESHOLDS = (0, 2000, 5000, 10000, 50000, 100000, 500000)
+_TICK_SIZES = (1, 5, 10, 50, 100, 500, 1000)
+
 def get_tick_size(price):
     """📌 업비트 호가 단위에 맞춰 주문 가격 반올림"""
-    if price < 2000:
-        return round(price, 0)  # 1원 단위
-    elif price < 5000:
-        return round(price / 5) * 5  # 5원 단위
-    elif price < 10000:
-        return round(price / 10) * 10  # 10원 단위
-    elif price < 50000:
-        return round(price / 50) * 50  # 50원 단위
-    elif price < 100000:
-        return round(price / 100) * 100  # 100원 단위
-    elif price < 500000:
-        return round(price / 500) * 500  # 500원 단위
-    else:
-        return round(price / 1000) * 1000  # 1000원 단위
+    tick = _TICK_SIZES[bisect.bisect_right(_TICK_THRESHOLDS, price) - 1]
+    return round(price / tick) * tick
 
 def calculate_stop_loss_take_profit(buy_price: float, atr: float, fee_rate: float):
     """📌 변동성 기반 손절가(stop_loss) 및 익절가(take_profit) 계산"""
@@ -419,27 +504,37 @@ def calculate_stop_loss_take_profit(buy_price: float, atr: float, fee_rate: floa
 
     return stop_loss, take_profit
 
-def get_orderbook_data(market: str):
-    """📌 업비트 API에서 주문장 데이터를 가져와 DataFrame으로 변환"""
-    url = f"https://api.upbit.com/v1/orderbook?markets={market}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()[0]  # 첫 번째 마켓 데이터 사용
-        orderbook_units = data["orderbook_units"]
+def orderbook_to_df(data) -> pd.DataFrame:
+    """📌 주문장 응답 1건을 DataFrame으로 변환"""
+    df_orderbook = pd.DataFrame(data["orderbook_units"])
 
-        df_orderbook = pd.DataFrame(orderbook_units)
+    df_orderbook.rename(columns={"bid_size": "buy_volume", "ask_size": "sell_volume"}, inplace=True)
 
-        df_orderbook.rename(columns={"bid_size": "buy_volume", "ask_size": "sell_volume"}, inplace=True)
+    # sell_wall/timestamp 컬럼은 현재 전략이 읽지 않으므로 만들지 않음 (호출마다 Series 할당 제거)
+    return df_orderbook
 
-        df_orderbook["sell_wall"] = df_orderbook["sell_volume"].rolling(5).mean()  # 최근 5개 평균
+def get_orderbook_data_batch(markets: list) -> dict:
+    """📌 여러 마켓 주문장을 한 번의 API 호출로 가져와 {market: DataFrame} 반환
 
-        df_orderbook["timestamp"] = pd.Timestamp.now()
+    업비트 orderbook 엔드포인트는 markets=KRW-BTC,KRW-ETH 형태의
+    일괄 조회를 지원하므로 마켓 수만큼의 왕복을 1회로 줄인다.
+    """
+    if not markets:
+        return {}
 
-        return df_orderbook
+    url = "https://api.upbit.com/v1/orderbook"
+    try:
+        response = _SESSION.get(url, params={"markets": ",".join(markets)})
+        response.raise_for_status()
+        return {data["market"]: orderbook_to_df(data) for data in _json(response)}
     except requests.RequestException as e:
-        print(f"🚨 주문장 데이터 가져오기 실패: {e}")
-        return pd.DataFrame()  # 비어 있는 DataFrame 반환
+        print(f"🚨 주문장 일괄 조회 실패: {e}")
+        return {}
+
+def get_orderbook_data(market: str):
+    """📌 업비트 API에서 주문장 데이터를 가져와 DataFrame으로 변환"""
+    df_orderbook = get_orderbook_data_batch([market]).get(market)
+    return df_orderbook if df_orderbook is not None else pd.DataFrame()  # 비어 있는 DataFrame 반환
 
 def get_avg_buy_price(order_uuid: str) -> Optional[float]:
     """📌 UUID 기반 평균 매수가 계산 (미체결이면 None)"""
@@ -450,8 +545,13 @@ def get_avg_buy_price(order_uuid: str) -> Optional[float]:
         print(f"⚠️ 체결 내역이 없거나 executed_volume == 0 → UUID: {order_uuid}")
         return None
 
-    total_volume = sum(float(trade["volume"]) for trade in trades)
-    total_cost = sum(float(trade["price"]) * float(trade["volume"]) for trade in trades)
+    # ✅ 수량/비용을 한 번의 순회로 동시에 집계 (체결 건마다 float 변환 1회)
+    total_volume = 0.0
+    total_cost = 0.0
+    for trade in trades:
+        volume = float(trade["volume"])
+        total_volume += volume
+        total_cost += float(trade["price"]) * volume
 
     if total_volume == 0:
         return None
@@ -472,19 +572,38 @@ def calculate_fixed_take_profit(buy_price: float, fee_rate: float):
     return buy_price * 1.01 * (1 - fee_rate * 2)
 
 def wait_for_limit_order(order_uuid, max_wait_time=10, interval=1):
-    start = time.time()
+    start = time.monotonic()  # ✅ 경과 시간 측정은 NTP 보정 영향이 없는 단조 시계 사용
     last_status = None
 
-    while time.time() - start < max_wait_time:
+    # ✅ 1차: myOrder 웹소켓 푸시로 체결 대기 (REST 폴링 1초 지연 제거)
+    #    스트림 미연결 시 즉시 None이 반환되어 아래 폴링으로 폴백한다.
+    fill = wait_for_fill(order_uuid, max_wait_time)
+    if fill is not None:
+        if fill.get("state") == "done":
+            print(f"✅ 지정가 체결 완료 (웹소켓 푸시) - UUID: {order_uuid}")
+            return True, check_order_status(order_uuid, max_retries=1, wait_time=0.3)
+        print(f"⛔ 주문 취소 감지 (웹소켓 푸시) - UUID: {order_uuid}")
+        return False, last_status
+
+    while time.monotonic() - start < max_wait_time:
         status = check_order_status(order_uuid, max_retries=1, wait_time=0.3)
         if status:
             last_status = status
             if status.get("state") == "done":
                 print(f"✅ 지정가 체결 완료 - UUID: {order_uuid}")
                 return True, status
-        print(f"⏳ 지정가 미체결, 대기 중... ({int(time.time() - start)}초 경과)")
+        print(f"⏳ 지정가 미체결, 대기 중... ({int(time.monotonic() - start)}초 경과)")
         time.sleep(interval)
 
+    # ✅ 실패 판정 전 REST로 최종 1회 확인
+    # (스트림 타임아웃 시 위 폴링이 0회 수행되므로 누락된 체결을 여기서 잡는다)
+    status = check_order_status(order_uuid, max_retries=1, wait_time=0.3)
+    if status:
+        last_status = status
+        if status.get("state") == "done":
+            print(f"✅ 지정가 체결 완료 (최종 확인) - UUID: {order_uuid}")
+            return True, status
+
     print(f"⛔ 지정가 체결 실패 - {max_wait_time}초 초과")
     return False, last_status
 
@@ -7,9 +7,9 @@ import numpy as np
 import pandas as pd
 from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.trend import MACD, ADXIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
+from ta.volatility import AverageTrueRange
 
-from account.my_account import get_my_exchange_account
+from account.my_account import get_account_cached, get_my_exchange_account
 from settings import MAX_TOTAL_INVEST, MAX_INVEST_PER_TICKER_RATIO
 from utils.balance_util import get_total_balance
 from db.trade_state import load_trade_status, save_trade_status
@@ -114,55 +114,70 @@ def update_realized_profit(order_uuid: str, avg_buy_price: float):
     logger.info(f"💰 부분 익절 실현 수익: +{profit:,.2f}원 | 누적 수익: {trading_context.realized_profit:,.2f}원")
     print(f"📈 실현 수익: +{profit:,.0f}원 | 누적 수익률: {profit_rate:.2f}%")
 
+# 부분 익절 차수별 매도 비율 (0회차 40% → 1회차 30% → 이후 10%)
+_PARTIAL_SELL_RATIOS = (0.4, 0.3, 0.1)
+
 def get_partial_sell_ratio(count: int) -> float:
-    if count == 0:
-        return 0.4
-    elif count == 1:
-        return 0.3
-    elif count == 2:
-        return 0.1
-    else:
-        return 0.1
+    return _PARTIAL_SELL_RATIOS[min(count, len(_PARTIAL_SELL_RATIOS) - 1)]
 
 def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFrame, df_orderbook: pd.DataFrame,
     position: int, ticker: str, buy_price: Optional[float] = None, fee_rate: float = 0.0005) -> dict:
-    logger.info(f"📊 {ticker} 매매 전략 시작 - 보유 여부: {position}, 현재가: {df_5m['close'].iloc[-1]}, 매수가: {buy_price}")
+    # 틱마다 실행되는 로그 → 지연 포매팅(%)으로 문자열 생성 비용을 레벨 통과 시로 미룸
+    logger.info("📊 %s 매매 전략 시작 - 보유 여부: %s, 현재가: %s, 매수가: %s", ticker, position, df_5m['close'].iat[-1], buy_price)
 
-    df_1m = df_1m.copy().ffill().dropna()
-    df_5m = df_5m.copy().ffill().dropna()
-    df_15m = df_15m.copy().ffill().dropna()
-    df_orderbook = df_orderbook.copy().ffill().dropna()
+    # ✅ ffill/dropna는 이미 새 객체를 반환하므로 선행 copy()는 전체 프레임 중복 복사일 뿐 → 제거
+    df_1m = df_1m.ffill().dropna()
+    df_5m = df_5m.ffill().dropna()
+    df_15m = df_15m.ffill().dropna()
+    df_orderbook = df_orderbook.ffill().dropna()
 
     if df_1m.empty or len(df_1m) < 14 or len(df_5m) < 200 or len(df_15m) < 100:
         return {"signal": "", "message": "데이터 부족"}
 
-    latest_close = df_5m['close'].iloc[-1]
-    orderbook_strength = df_orderbook['buy_volume'].sum() / (df_orderbook['sell_volume'].sum() + 1e-9)
+    # ✅ 지표는 최근 구간만 참조 (최장 창: MACD 장기 200) → 꼬리 300개로 잘라
+    #    전체 히스토리 O(N) 재계산 비용이 프레임 성장에 따라 늘지 않도록 고정
+    df_1m = df_1m.iloc[-300:]
+    df_5m = df_5m.iloc[-300:]
+    df_15m = df_15m.iloc[-300:]
+
+    # ✅ 핫패스에서 반복되는 iloc 스칼라 접근 대신 NumPy 배열로 한 번만 추출
+    close_5m = df_5m['close'].to_numpy()
+    open_5m = df_5m['open'].to_numpy()
+    low_5m = df_5m['low'].to_numpy()
+    close_1m = df_1m['close'].to_numpy()
+    low_1m = df_1m['low'].to_numpy()
+    buy_volume = df_orderbook['buy_volume'].to_numpy()
+    sell_volume = df_orderbook['sell_volume'].to_numpy()
+
+    latest_close = close_5m[-1]
+    orderbook_strength = buy_volume.sum() / (sell_volume.sum() + 1e-9)
     orderbook_strength = 1 if np.isnan(orderbook_strength) else orderbook_strength
 
     if buy_price is None:
         buy_price = latest_close
-        logger.info(f"ℹ️ {ticker} buy_price가 None → 현재가로 대체: {latest_close}")
+        logger.info("ℹ️ %s buy_price가 None → 현재가로 대체: %s", ticker, latest_close)
 
     # ===== 기술 지표 계산 =====
     rsi_5m = RSIIndicator(df_5m['close'], window=14).rsi().fillna(50).iloc[-1]
-    rsi_1m = RSIIndicator(df_1m['close'], window=14).rsi().fillna(50)
-    bb = BollingerBands(df_5m['close'], window=20)
-    bb_lower_5m = bb.bollinger_lband().fillna(latest_close)
+    rsi_1m = RSIIndicator(df_1m['close'], window=14).rsi().fillna(50).to_numpy()
+    # ✅ 볼린저 하단은 마지막 값만 필요 → 마지막 20개 창에서 직접 계산 (ta 시리즈 할당 제거, ddof=0 동일)
+    bb_window = close_5m[-20:]
+    bb_lower_last = bb_window.mean() - 2 * bb_window.std()
     stoch = StochasticOscillator(df_5m['high'], df_5m['low'], df_5m['close'], window=14, smooth_window=3)
-    stoch_k, stoch_d = stoch.stoch().iloc[-1], stoch.stoch_signal().iloc[-1]
-    stoch_k_prev = stoch.stoch().iloc[-2]
+    stoch_k_series = stoch.stoch()  # ✅ 동일 시리즈 중복 계산 제거
+    stoch_k, stoch_d = stoch_k_series.iloc[-1], stoch.stoch_signal().iloc[-1]
+    stoch_k_prev = stoch_k_series.iloc[-2]
     macd = MACD(df_5m['close'], window_slow=12, window_fast=26, window_sign=9)
     macd_val, macd_diff = macd.macd().iloc[-1], macd.macd_diff().iloc[-1]
     adx_val = ADXIndicator(df_5m['high'], df_5m['low'], df_5m['close'], window=14).adx().iloc[-1]
     atr = AverageTrueRange(df_5m['high'], df_5m['low'], df_5m['close'], window=14).average_true_range().iloc[-1]
-    bullish_candles = (df_5m['close'].iloc[-3:] > df_5m['open'].iloc[-3:]).sum()
-    volume_spike = df_orderbook['buy_volume'].iloc[-1] > df_orderbook['buy_volume'].mean() * 2
-    recent_low = df_5m['low'].rolling(window=20).min().iloc[-1]
-    is_bullish = df_5m['close'].iloc[-1] > df_5m['open'].iloc[-1]
+    bullish_candles = (close_5m[-3:] > open_5m[-3:]).sum()
+    volume_spike = buy_volume[-1] > buy_volume.mean() * 2
+    recent_low = low_5m[-20:].min()  # rolling(20).min().iloc[-1]과 동일, 마지막 창만 계산
+    is_bullish = close_5m[-1] > open_5m[-1]
     is_bearish = not is_bullish
-    rsi_1m_drop = rsi_1m.iloc[-1] < 30 and rsi_1m.iloc[-1] < rsi_1m.iloc[-2]
-    is_breaking_1m_support = df_1m['close'].iloc[-1] < df_1m['low'].rolling(5).min().iloc[-2]
+    rsi_1m_drop = rsi_1m[-1] < 30 and rsi_1m[-1] < rsi_1m[-2]
+    is_breaking_1m_support = close_1m[-1] < low_1m[-6:-1].min()  # rolling(5).min().iloc[-2]와 동일
 
     now_hour = datetime.now().hour
     is_morning = 9 <= now_hour < 11
@@ -181,7 +196,7 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
         logger.info(f"🔥 {ticker} 장기 MACD 골든크로스 발생! (기울기: {macd_long_slope:.4f})")
 
     current_volume_ratio = get_current_volume_ratio(ticker)
-    my_asset = get_my_exchange_account()
+    my_asset = get_account_cached()  # ✅ 읽기 전용 조회 → TTL 캐시 사용 (REST 호출 절감)
     asset_data = my_asset.get("assets", {}).get(ticker)
     balance = float(asset_data.get("balance", 0)) if asset_data else 0
     current_investment = balance * latest_close
@@ -194,8 +209,9 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
         buy_price is not None and
         latest_close < buy_price * 0.985  # 평단 대비 최소 1.5% 하락 시에만 추가 매수
     )
-    logger.info(f"[DEBUG] {ticker} 매수조건 체크용 → current_volume_ratio={current_volume_ratio:.3f}, buy_price={buy_price}, latest_close={latest_close}")
-    logger.info(f"[DEBUG] {ticker} is_low_volume_entry → {is_low_volume_entry}")
+    # 매 평가마다 찍히는 로그는 지연 포매팅(%) 사용 → 레벨 필터 시 문자열 생성 비용 0
+    logger.info("[DEBUG] %s 매수조건 체크용 → current_volume_ratio=%.3f, buy_price=%s, latest_close=%s", ticker, current_volume_ratio, buy_price, latest_close)
+    logger.info("[DEBUG] %s is_low_volume_entry → %s", ticker, is_low_volume_entry)
 
     is_partial_reentry = (
         trading_context.partial_sell_count.get(ticker, 0) > 0 and
@@ -227,11 +243,11 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
         orderbook_strength > 1.05
     )
 
-    logger.info(f"[CHECK] 매수 조건 진입 여부 확인: position={position}, partial_reentry={is_partial_reentry}, exception={is_partial_reentry_exception}, follow_up={is_partial_reentry_follow_up}, uptrend={is_partial_reentry_uptrend_entry}")
-    logger.info(f"[CHECK] {ticker} 매수 조건 평가 시작 - buy_price: {buy_price}, latest_close: {latest_close}")
+    logger.info("[CHECK] 매수 조건 진입 여부 확인: position=%s, partial_reentry=%s, exception=%s, follow_up=%s, uptrend=%s", position, is_partial_reentry, is_partial_reentry_exception, is_partial_reentry_follow_up, is_partial_reentry_uptrend_entry)
+    logger.info("[CHECK] %s 매수 조건 평가 시작 - buy_price: %s, latest_close: %s", ticker, buy_price, latest_close)
     # === 매수 조건 ===
-    logger.info(f"[DEBUG] {ticker} 매수 조건 진입 체크 → position={position}, partial={is_partial_reentry}, exception={is_partial_reentry_exception}, follow_up={is_partial_reentry_follow_up}, uptrend={is_partial_reentry_uptrend_entry}")
-    logger.info(f"[DEBUG] {ticker} 현재 partial_sell_count: {trading_context.partial_sell_count.get(ticker)} / avg_buy_price: {trading_context.avg_buy_price.get(ticker)} / balance: {balance:.2f}")
+    logger.info("[DEBUG] %s 매수 조건 진입 체크 → position=%s, partial=%s, exception=%s, follow_up=%s, uptrend=%s", ticker, position, is_partial_reentry, is_partial_reentry_exception, is_partial_reentry_follow_up, is_partial_reentry_uptrend_entry)
+    logger.info("[DEBUG] %s 현재 partial_sell_count: %s / avg_buy_price: %s / balance: %.2f", ticker, trading_context.partial_sell_count.get(ticker), trading_context.avg_buy_price.get(ticker), balance)
     if (
         position == 0 or
         is_partial_reentry or
@@ -269,7 +285,7 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
         if current_investment >= max_per_ticker:
             return {"signal": "", "message": "투자 비중 초과 → 매수 금지"}
 
-        price_change_5m = df_5m['close'].iloc[-1] / df_5m['close'].iloc[-6] - 1
+        price_change_5m = close_5m[-1] / close_5m[-6] - 1
         if price_change_5m > 0.05:
             logger.warning(f"🚫 {ticker} 최근 5분간 5% 이상 급등 → 매수 보류")
             return {"signal": "", "message": "급등 이후 진입 제한"}
@@ -324,9 +340,9 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
             ((adx_val > 25 and macd_val > 0), "ADX 25 이상 + MACD 상승"),
             ((trading_context.consecutive_losses.get(ticker, 0) >= 5 and rsi_5m < 25 and macd_val > 0.1 and volume_spike), "연속 손절 후 재매수 허용"),
             ((trading_context.consecutive_losses.get(ticker, 0) > 3 and rsi_5m < 25 and macd_val > 0), "강제 매수 조건"),
-            ((rsi_5m < 35 and latest_close <= bb_lower_5m.iloc[-1] and bullish_candles >= 2 and orderbook_strength < 1.2), "천천히 반등 매수"),
-            ((latest_close <= bb_lower_5m.iloc[-1] and rsi_5m < 35 and volume_spike), "볼린저 하단 반등"),
-            (((rsi_5m < 35 and latest_close <= bb_lower_5m.iloc[-1]) or (orderbook_strength > 1.3 and stoch_k > stoch_d) or (is_bullish and macd_val > -0.05)), "복합 조건 매수"),
+            ((rsi_5m < 35 and latest_close <= bb_lower_last and bullish_candles >= 2 and orderbook_strength < 1.2), "천천히 반등 매수"),
+            ((latest_close <= bb_lower_last and rsi_5m < 35 and volume_spike), "볼린저 하단 반등"),
+            (((rsi_5m < 35 and latest_close <= bb_lower_last) or (orderbook_strength > 1.3 and stoch_k > stoch_d) or (is_bullish and macd_val > -0.05)), "복합 조건 매수"),
             ((stoch_k > 20 and (stoch_k - stoch_d) > 10 and stoch_k > stoch_k_prev and volume_spike), "스토캐스틱 반등 매수"),
             ((is_bearish and rsi_5m < 30 and latest_close > recent_low and stoch_k < 20), "하락장 반등 매수"),
         ]
@@ -339,7 +355,7 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
                 elif "스토캐스틱" in message:
                     logger.info(f"✅ {ticker} 매수 조건 충족 → {message} (Stoch_K: {stoch_k:.2f}, Stoch_D: {stoch_d:.2f})")
                 elif "볼린저" in message:
-                    logger.info(f"✅ {ticker} 매수 조건 충족 → {message} (현재가: {latest_close:.2f}, BB 하단: {bb_lower_5m.iloc[-1]:.2f})")
+                    logger.info(f"✅ {ticker} 매수 조건 충족 → {message} (현재가: {latest_close:.2f}, BB 하단: {bb_lower_last:.2f})")
                 else:
                     logger.info(f"✅ {ticker} 매수 조건 충족 → {message}")
 
@@ -402,14 +418,15 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
             logger.info(f"📈 {ticker} 최고가 갱신 → {new_peak:.2f}")
 
         # === 예외 처리: 급락 or 트레일링 스탑 발생 시 쿨다운 무시 ===
-        is_critical_drop_price = latest_close < df_5m['low'].rolling(window=15).min().iloc[-1] * 0.99
-        price_is_falling = latest_close < df_5m['close'].iloc[-2]
-        is_red_candle = df_5m['close'].iloc[-1] < df_5m['open'].iloc[-1]
+        recent_low_15 = low_5m[-15:].min()  # rolling(15).min().iloc[-1]과 동일, 마지막 창만 계산
+        is_critical_drop_price = latest_close < recent_low_15 * 0.99
+        price_is_falling = latest_close < close_5m[-2]
+        is_red_candle = close_5m[-1] < open_5m[-1]
 
         is_critical_drop_orderbook = (
             price_is_falling and
             is_red_candle and (
-                df_orderbook['sell_volume'].iloc[-5:].mean() > df_orderbook['sell_volume'].mean() * 3 or
+                sell_volume[-5:].mean() > sell_volume.mean() * 3 or
                 orderbook_strength < 0.6
             )
         )
@@ -422,7 +439,7 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
             return {"signal": "", "message": "우상향 추세 → 매도 보류"}
 
         # === 급락 시 강한 매수벽 있을 경우 매도 보류 ===
-        buy_wall = df_orderbook['buy_volume'].iloc[-1] > df_orderbook['buy_volume'].mean() * 2
+        buy_wall = buy_volume[-1] > buy_volume.mean() * 2
         if is_critical_drop_orderbook and buy_wall:
             logger.info(f"📛 {ticker} 급락 중 매수벽 확인 → 매도 보류")
             return {"signal": "", "message": "급락 중 매수벽 존재 → 매도 보류"}
@@ -436,7 +453,7 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
         sell_conditions = [
             # ❶ 최근 저가 하회 (15개 캔들 기준 손절)
             (
-                latest_close < df_5m['low'].rolling(window=15).min().iloc[-1] * 0.99,
+                latest_close < recent_low_15 * 0.99,
                 "sell",
                 "최근 15개 캔들 최저가 하회 → 손절"
             ),
@@ -458,7 +475,7 @@ def trading_strategy(df_1m: pd.DataFrame, df_5m: pd.DataFrame, df_15m: pd.DataFr
             # ❹ 5분봉 하락 + 매도세 급증 → 전량 매도
             (
                 price_is_falling and is_red_candle and
-                (df_orderbook['sell_volume'].iloc[-5:].mean() > df_orderbook['sell_volume'].mean() * 3 or orderbook_strength < 0.5) and
+                (sell_volume[-5:].mean() > sell_volume.mean() * 3 or orderbook_strength < 0.5) and
                 net_profit > buy_price * 0.002 and
                 not (macd_val > 0 and adx_val > 25 and latest_close > buy_price * 1.005),
                 "sell",
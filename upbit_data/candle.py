@@ -1,16 +1,49 @@
 import requests
 import pandas as pd
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from tenacity import retry, stop_after_attempt, wait_fixed
 
 headers = {"Accept": "application/json"}
 logger = logging.getLogger(__name__)
 
+# ✅ 시세(Quotation) API는 초당 10회 제한 → 티커×분봉 병렬 조회가 한꺼번에 몰려도
+#    최근 1초간 요청 수를 세어 한도 내로 흘려보냄
+_RATE_LIMIT_PER_SEC = 10
+_rate_lock = threading.Lock()
+_recent_request_times = deque()
+
+
+def _throttle_quotation():
+    """최근 1초 요청이 한도에 도달했으면 가장 오래된 요청이 만료될 때까지 대기"""
+    while True:
+        with _rate_lock:
+            now = time.monotonic()
+            while _recent_request_times and now - _recent_request_times[0] >= 1.0:
+                _recent_request_times.popleft()
+            if len(_recent_request_times) < _RATE_LIMIT_PER_SEC:
+                _recent_request_times.append(now)
+                return
+            wait = 1.0 - (now - _recent_request_times[0])
+        time.sleep(wait)
+
+# ✅ 분봉 병렬 조회가 매번 TLS 핸드셰이크를 반복하지 않도록 커넥션 풀 세션 공유
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# ✅ 소비자(전략)가 기대하는 컬럼 계약 — fetch 시점에 1회 검증
+REQUIRED_COLUMNS = frozenset(('open', 'high', 'low', 'close', 'volume', 'datetime'))
+
 # 🔹 ✅ **재시도 로직 추가**
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))  # 3번 재시도, 2초 대기
 def fetch_candle_data(url, params):
     """API 요청을 보내고 JSON 데이터를 반환 (실패 시 자동 재시도)"""
-    response = requests.get(url, params=params, headers=headers)
+    _throttle_quotation()
+    response = _SESSION.get(url, params=params, headers=headers)
     response.raise_for_status()
     try:
         return response.json()
@@ -18,63 +51,79 @@ def fetch_candle_data(url, params):
         logger.error(f"🚨 JSON 디코딩 오류 발생 - 응답: {response.text}")
         return []
 
-def get_min_candle_data(market: str, minutes: list):
-    """
-    특정 종목의 여러 분봉 데이터를 가져와 Dictionary로 반환
 
-    :param market: 조회할 시장 (예: "KRW-BTC")
-    :param minutes: 조회할 분봉 리스트 (예: [5, 15])
-    :return: 각 분봉 데이터를 담은 dictionary (key: minute, value: DataFrame)
-    """
-    candle_data_by_minute = {}
+def _fetch_minute_candles(market: str, minute: int, pages: int = 5):
+    """단일 분봉의 페이지네이션 조회 (페이지는 직전 시각에 의존하므로 순차 진행)"""
+    candle_min_url = f'https://api.upbit.com/v1/candles/minutes/{minute}'
+    candle_all_data = None
+    last_time = None
+
+    for i in range(pages):  # 최신 pages * 200개의 데이터 조회
+        candle_min_params = {"market": market, "count": 200}
+        if i > 0:
+            candle_min_params["to"] = last_time  # 마지막 데이터의 시간을 기준으로 가져옴
+
+        try:
+            json_data = fetch_candle_data(candle_min_url, candle_min_params)  # ✅ 재시도 적용된 API 요청
 
-    for minute in minutes:  # ✅ 각각의 분봉에 대해 별도 요청
-        candle_min_url = f'https://api.upbit.com/v1/candles/minutes/{minute}'
-        candle_all_data = None
-        last_time = None
+            if not json_data:
+                logger.warning(f"[WARNING] {market} {minute}분봉 API 응답이 빈 리스트 []")
+                continue
 
-        for i in range(5):  # 최신 5 * 200개의 데이터 조회
-            candle_min_params = {"market": market, "count": 200}
-            if i > 0:
-                candle_min_params["to"] = last_time  # 마지막 데이터의 시간을 기준으로 가져옴
+            candle_min_data = pd.DataFrame(json_data)
 
-            try:
-                json_data = fetch_candle_data(candle_min_url, candle_min_params)  # ✅ 재시도 적용된 API 요청
+            if candle_min_data.empty:
+                logger.warning(f"[WARNING] {market} {minute}분봉 데이터가 비어 있음.")
+                continue
 
-                if not json_data:
-                    logger.warning(f"[WARNING] {market} {minute}분봉 API 응답이 빈 리스트 []")
-                    continue
+            candle_min_data['datetime'] = pd.to_datetime(
+                candle_min_data['candle_date_time_kst'], format="%Y-%m-%dT%H:%M:%S", errors="coerce"
+            )
 
-                candle_min_data = pd.DataFrame(json_data)
+            candle_min_data.rename(columns={
+                'opening_price': 'open',
+                'trade_price': 'close',
+                'high_price': 'high',
+                'low_price': 'low',
+                'candle_acc_trade_volume': 'volume'
+            }, inplace=True)
 
-                if candle_min_data.empty:
-                    logger.warning(f"[WARNING] {market} {minute}분봉 데이터가 비어 있음.")
-                    continue
+            candle_min_data.drop(columns=['candle_date_time_utc', 'candle_date_time_kst', 'timestamp'], inplace=True)
 
-                candle_min_data['datetime'] = pd.to_datetime(
-                    candle_min_data['candle_date_time_kst'], format="%Y-%m-%dT%H:%M:%S", errors="coerce"
-                )
+            last_time = candle_min_data['datetime'].iloc[-1].strftime('%Y-%m-%dT%H:%M:%S')
 
-                candle_min_data.rename(columns={
-                    'opening_price': 'open',
-                    'trade_price': 'close',
-                    'high_price': 'high',
-                    'low_price': 'low',
-                    'candle_acc_trade_volume': 'volume'
-                }, inplace=True)
+            candle_all_data = (pd.concat([candle_all_data, candle_min_data], ignore_index=True)
+                               if candle_all_data is not None else candle_min_data)
 
-                candle_min_data.drop(columns=['candle_date_time_utc', 'candle_date_time_kst', 'timestamp'], inplace=True)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[ERROR] {market} {minute}분봉 데이터를 가져오는 중 오류 발생: {e}")
+            break
 
-                last_time = candle_min_data['datetime'].iloc[-1].strftime('%Y-%m-%dT%H:%M:%S')
+    return candle_all_data
 
-                candle_all_data = (pd.concat([candle_all_data, candle_min_data], ignore_index=True)
-                                   if candle_all_data is not None else candle_min_data)
 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"[ERROR] {market} {minute}분봉 데이터를 가져오는 중 오류 발생: {e}")
-                break
+def get_min_candle_data(market: str, minutes: list, pages: int = 5):
+    """
+    특정 종목의 여러 분봉 데이터를 가져와 Dictionary로 반환
+
+    :param market: 조회할 시장 (예: "KRW-BTC")
+    :param minutes: 조회할 분봉 리스트 (예: [5, 15])
+    :param pages: 페이지당 200개 기준 조회 페이지 수 (실시간 경로는 줄여서 사용)
+    :return: 각 분봉 데이터를 담은 dictionary (key: minute, value: DataFrame)
+    """
+    candle_data_by_minute = {}
+
+    # ✅ 분봉별 조회는 서로 독립 → 병렬 요청으로 총 대기 시간을 max(지연)으로 단축
+    with ThreadPoolExecutor(max_workers=len(minutes)) as executor:
+        results = executor.map(lambda m: (m, _fetch_minute_candles(market, m, pages)), minutes)
 
+    for minute, candle_all_data in results:
         if candle_all_data is not None and not candle_all_data.empty:
+            # ✅ 컬럼 계약을 여기서 한 번만 검증 → 소비자 핫루프의 재검증 제거
+            if not REQUIRED_COLUMNS.issubset(candle_all_data.columns):
+                missing = REQUIRED_COLUMNS.difference(candle_all_data.columns)
+                logger.error(f"[ERROR] {market} {minute}분봉 필수 컬럼 누락: {missing}")
+                continue
             candle_all_data = candle_all_data.sort_values(by='datetime').drop_duplicates(subset=['datetime'], keep='last')
             candle_data_by_minute[minute] = candle_all_data
         else:
@@ -1,36 +1,48 @@
 import pandas as pd
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # 실시간 가격 저장 버퍼
-price_buffer = defaultdict(list)  # {ticker: [{"price": 1234, "volume": 1.2, "timestamp": datetime}]}
-current_candle = {}
+# dict 리스트 대신 (timestamp, price, volume) 튜플 deque 사용
+# → 틱당 할당량 감소 + 오래된 틱을 수신 시점에 앞에서 제거
+price_buffer = defaultdict(deque)  # {ticker: deque[(datetime, price, volume)]}
+
+_BUFFER_WINDOW = timedelta(minutes=2)
 
 def update_price_buffer(ticker: str, price: float, volume: float):
   now = datetime.now()
-  price_buffer[ticker].append({
-    "price": price,
-    "volume": volume,
-    "timestamp": now
-  })
+  buf = price_buffer[ticker]
+  buf.append((now, price, volume))
+
+  # ✅ 버퍼가 무한히 자라지 않도록 수신 시점에 윈도우 밖 틱 제거
+  cutoff = now - _BUFFER_WINDOW
+  while buf and buf[0][0] < cutoff:
+    buf.popleft()
 
 def build_1m_candle(ticker: str) -> pd.DataFrame:
   now = datetime.now()
   one_min_ago = now - timedelta(minutes=1)
 
-  recent_trades = [p for p in price_buffer[ticker] if p["timestamp"] >= one_min_ago]
-
-  if not recent_trades:
+  # ✅ 중간 DataFrame 없이 한 번의 순회로 OHLCV 집계
+  open_price = high_price = low_price = close_price = None
+  volume_sum = 0.0
+
+  for ts, price, volume in price_buffer[ticker]:
+    if ts < one_min_ago:
+      continue
+    if open_price is None:
+      open_price = high_price = low_price = price
+    else:
+      if price > high_price:
+        high_price = price
+      if price < low_price:
+        low_price = price
+    close_price = price
+    volume_sum += volume
+
+  if open_price is None:
     return pd.DataFrame()
 
-  df = pd.DataFrame(recent_trades)
-
-  open_price = df["price"].iloc[0]
-  high_price = df["price"].max()
-  low_price = df["price"].min()
-  close_price = df["price"].iloc[-1]
-  volume_sum = df["volume"].sum()
-
   candle = pd.DataFrame([{
     "datetime": now.replace(second=0, microsecond=0),
     "open": open_price,
@@ -40,7 +52,4 @@ def build_1m_candle(ticker: str) -> pd.DataFrame:
     "volume": volume_sum
   }])
 
-  # 업데이트 후 2분 전 데이터는 삭제
-  price_buffer[ticker] = [p for p in price_buffer[ticker] if p["timestamp"] >= one_min_ago]
-
   return candle
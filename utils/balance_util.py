@@ -1,7 +1,8 @@
 import requests
+from requests.adapters import HTTPAdapter
 
 import time
-from account.my_account import get_my_exchange_account
+from account.my_account import get_account_cached
 from trading.trade import generate_auth_headers, ORDERS_CHANCE_URL
 from utils.constants import TICKER_URL
 from utils.constants import ORDERS_CHANCE_URL
@@ -10,7 +11,7 @@ from utils.constants import ORDERS_CHANCE_URL
 def get_total_balance(account_data=None) -> float:
   """💰 내 전체 자산 (현금 + 보유 코인 평가금액) 계산"""
   if account_data is None:
-    account_data = get_my_exchange_account()
+    account_data = get_account_cached()  # ✅ 읽기 전용 집계 → TTL 캐시로 충분
 
   total_balance = 0.0
 
@@ -20,36 +21,86 @@ def get_total_balance(account_data=None) -> float:
   # ✅ 현금(KRW) 포함 (여기서만 추가)
   total_balance += float(account_data.get("KRW", 0))
 
+  # ✅ 보유 코인 현재가를 한 번의 Ticker API 호출로 일괄 조회 (코인당 1회 호출 제거)
+  markets = [f"KRW-{symbol}" for symbol in account_data["assets"] if symbol != "KRW"]
+  prices = get_current_prices(markets)
+
   for symbol, info in account_data["assets"].items():
     if symbol == "KRW":
       continue  # 현금은 이미 추가했으므로 패스
     balance = float(info.get("balance", 0))
-    market = f"KRW-{symbol}"
-    current_price = get_current_price(market)
+    current_price = prices.get(f"KRW-{symbol}", 1.0)
     total_balance += balance * current_price
 
   return total_balance
 
 
+def get_current_prices(markets: list) -> dict:
+  """📌 여러 마켓 현재가를 Ticker API 1회 호출로 조회 ({market: price})"""
+  if not markets:
+    return {}
+
+  try:
+    params = {"markets": ",".join(markets)}
+    response = _SESSION.get(TICKER_URL, params=params, timeout=3)
+    response.raise_for_status()
+    return {item["market"]: float(item["trade_price"]) for item in response.json()}
+  except requests.exceptions.RequestException as e:
+    print(f"🚨 현재가 일괄 조회 오류: {e}")
+    return {}
+
+
+# ✅ 현재가 단기 캐시 (1초 TTL) — 같은 틱 처리 중 반복 조회 시 API 왕복 제거
+_PRICE_CACHE_TTL = 1.0
+_price_cache = {}  # {market: (price, expiry)}
+
+
 def get_current_price(market: str) -> float:
-  """📌 현재가 조회 (업비트 Ticker API)"""
+  """📌 현재가 조회 (업비트 Ticker API, 1초 TTL 캐시)"""
+  hit = _price_cache.get(market)
+  if hit is not None and hit[1] > time.monotonic():
+    return hit[0]
+
   try:
     params = {"markets": market}
-    response = requests.get(TICKER_URL, params=params, timeout=3)
+    response = _SESSION.get(TICKER_URL, params=params, timeout=3)
     response.raise_for_status()
     data = response.json()
-    return float(data[0]["trade_price"])
+    price = float(data[0]["trade_price"])
+    _price_cache[market] = (price, time.monotonic() + _PRICE_CACHE_TTL)
+    return price
   except requests.exceptions.RequestException as e:
     print(f"🚨 현재가 조회 오류: {e}")
-    return 1.0  # ✅ None 대신 기본값 반환 (ZeroDivisionError 방지)
+    return 1.0  # ✅ None 대신 기본값 반환 (ZeroDivisionError 방지) — 오류 값은 캐시하지 않음
+
+# ✅ 커넥션 풀 공유 세션 (trade/my_account와 동일하게 keep-alive 재사용)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# ✅ 마켓별 최소 거래 금액은 거래소 정책이라 거의 변하지 않음 → 1회 조회 후 캐시
+_min_total_cache = {}  # {market: min_total}
+
+
+def get_min_trade_volume(market: str, trade_price: float = None) -> float:
+  """📌 최소 거래 수량 계산 (Rate Limit 처리 추가)
+
+  최소 거래 금액은 캐시하고, 호출부가 이미 현재가를 알고 있으면
+  trade_price로 넘겨 현재가 재조회 API 호출도 생략한다.
+  """
+  cached_min_total = _min_total_cache.get(market)
+  if cached_min_total is not None:
+    if trade_price is None or trade_price <= 0:
+      trade_price = get_current_price(market)
+    if trade_price <= 0:
+      return 0.01
+    return max(cached_min_total / trade_price, 0.01)
 
-def get_min_trade_volume(market: str) -> float:
-  """📌 최소 거래 수량 계산 (Rate Limit 처리 추가)"""
   max_retries = 3  # 최대 3회 재시도
   for attempt in range(max_retries):
     try:
-      # ✅ 현재가 조회 (1.0 이상의 값이 보장됨)
-      trade_price = get_current_price(market)
+      # ✅ 현재가 조회 (호출부 제공 값이 있으면 재사용, 1.0 이상의 값이 보장됨)
+      if trade_price is None or trade_price <= 0:
+        trade_price = get_current_price(market)
 
       # ✅ 혹시라도 1.0 미만 값이 나오면 안전한 기본값 사용
       if trade_price <= 0:
@@ -59,11 +110,11 @@ def get_min_trade_volume(market: str) -> float:
       # 최소 거래 금액 조회
       params = {"market": market}
       headers = generate_auth_headers(params)
-      response = requests.get(ORDERS_CHANCE_URL, params=params, headers=headers)
+      response = _SESSION.get(ORDERS_CHANCE_URL, params=params, headers=headers)
 
       if response.status_code == 429:  # 요청이 너무 많을 경우
         print(f"⚠️ 요청이 너무 많음! {attempt + 1}/{max_retries}회 재시도 중...")
-        time.sleep(1)  # 1초 대기 후 재시도
+        time.sleep(2 ** attempt)  # ✅ 지수 백오프 (1→2→4초)
         continue  # 다음 루프로 이동
 
       response.raise_for_status()
@@ -77,6 +128,8 @@ def get_min_trade_volume(market: str) -> float:
         print(f"⚠️ API 응답 이상: 최소 거래 금액이 0 이하. 기본값(5000.0) 사용")
         min_total = 5000.0  # 기본값 설정
 
+      _min_total_cache[market] = min_total  # ✅ 다음 호출부터는 API 재조회 없이 사용
+
       # 최소 거래 수량 계산
       min_trade_volume = min_total / trade_price
       return max(min_trade_volume, 0.01)
@@ -89,7 +142,7 @@ def get_min_trade_volume(market: str) -> float:
 def get_krw_balance(account_data=None) -> float:
   """💰 보유 현금(KRW)만 조회"""
   if account_data is None:
-    account_data = get_my_exchange_account()
+    account_data = get_account_cached()  # ✅ 읽기 전용 집계 → TTL 캐시로 충분
 
   if not account_data or "assets" not in account_data:
     return 0.0
@@ -1,29 +1,64 @@
 # UPbitAutoTrading_dev/websocket_client.py
 
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import websocket
 
-from account.my_account import get_my_exchange_account
-from example import market_data_cache, position, process_ticker
+from account.my_account import get_account_cached
+from example import get_pos, market_data_cache, position, process_ticker
 from settings import TRADE_TICKERS
-from trading.trade import get_orderbook_data
+from trading.trade import get_orderbook_data, orderbook_to_df
 from upbit_data.candle import get_min_candle_data
 from upbit_data.candle_builder import update_price_buffer, build_1m_candle
 from upbit_data.candle_cache import update_candle_cache
 
+# ✅ 티커별 전략 실행을 병렬화하는 풀
+# (웹소켓 수신 스레드가 주문 폴링에 묶여 다른 티커 처리가 밀리는 것을 방지)
+_strategy_executor = ThreadPoolExecutor(max_workers=len(TRADE_TICKERS), thread_name_prefix="strategy")
+
+# ✅ REST 분봉 갱신 주기 제한 (체결 틱마다 호출하지 않고 분 단위로만 갱신)
+# 실시간 가격은 trade 스트림 + 1분봉 버퍼가 이미 담당하므로
+# 5m/15m 캔들은 새 분봉이 생길 수 있는 주기에만 다시 가져온다.
+_CANDLE_REFRESH_SEC = 60
+_last_candle_fetch = {}  # {ticker: time.monotonic()}
+
+# ✅ 티커별 처리 중복 방지 (풀 큐에 같은 티커 작업이 쌓이지 않도록)
+_inflight_tickers = set()
+_inflight_lock = threading.Lock()
+
+# ✅ 주문장 푸시 캐시: {ticker: 최신 orderbook 프레임(원본 dict)}
+# DataFrame 변환은 전략 실행 시점에만 수행 (푸시마다 변환하지 않음)
+_orderbook_cache = {}
+
+# ✅ 전략은 분봉이 새로 닫힌 뒤 1회만 실행 (같은 분 안의 틱 반복 평가 제거)
+_last_strategy_minute = {}  # {ticker: "HH:MM" 단위 키}
+
+# ✅ 단, 보유 중에는 손절/트레일링 스탑이 분 경계를 기다리면 안 됨
+# → 같은 분 안에서도 일정 간격으로 재평가 허용
+_HOLDING_REEVAL_SEC = 5
+_last_holding_eval = {}  # {ticker: time.monotonic()}
+
 
 def on_message(ws, message):
+  """수신 스레드: 프레임 파싱 + 가격 버퍼 적재만 하고 무거운 처리는 풀에 위임"""
   data = json.loads(message)
   code = data.get("code", "")
-  price = data.get("trade_price", 0)
   ticker = code.replace("KRW-", "")
 
   if ticker not in TRADE_TICKERS:
     return
 
+  # 🔹 주문장 푸시: 최신 프레임만 보관하고 종료 (REST 주문장 조회 대체)
+  if data.get("type") == "orderbook":
+    _orderbook_cache[ticker] = data
+    return
+
+  price = data.get("trade_price", 0)
+
   print(f"[{datetime.now().strftime('%H:%M:%S')}] 실시간 가격 수신: {ticker} = {price}")
 
   # 🔹 실시간 1분봉 버퍼에 누적
@@ -37,28 +72,56 @@ def on_message(ws, message):
     if not df_1m_live.empty:
       update_candle_cache(ticker, "1m", df_1m_live)
 
-  # 🔹 기존 5m, 15m API 캔들 가져오기
-  candle_data = get_min_candle_data(code, [5, 15])
-  if candle_data:
-    update_candle_cache(ticker, "5m", candle_data.get(5))
-    update_candle_cache(ticker, "15m", candle_data.get(15))
+  # 🔹 같은 분 안에서는 데이터가 사실상 동일 → 새 분봉이 생긴 뒤 첫 틱에만 전략 실행
+  # 보유 중인 티커는 예외: 급락 시 분 경계를 기다리지 않도록 짧은 간격으로 재평가
+  minute_key = now.strftime("%Y-%m-%d %H:%M")
+  if _last_strategy_minute.get(ticker) == minute_key:
+    is_holding = get_pos(ticker).get("balance", 0) > 0
+    if not is_holding:
+      return
+    mono_now = time.monotonic()
+    if mono_now - _last_holding_eval.get(ticker, 0.0) < _HOLDING_REEVAL_SEC:
+      return
+    _last_holding_eval[ticker] = mono_now
+
+  # 🔹 캔들 갱신 + 주문장/잔고 조회 + 전략 실행은 수신 스레드 밖에서 처리
+  with _inflight_lock:
+    if ticker in _inflight_tickers:
+      return  # 같은 티커 작업이 이미 진행 중 → 이번 틱은 건너뜀
+    _inflight_tickers.add(ticker)
+
+  _last_strategy_minute[ticker] = minute_key
+
+  _strategy_executor.submit(_handle_ticker_tick, ticker, code)
+
 
-  # 1분, 5분, 15분봉 업데이트
+def _handle_ticker_tick(ticker, code):
+  """캔들 갱신 → 주문장/잔고 조회 → 전략 실행 (워커 스레드에서 수행)"""
+  # 1분, 5분, 15분봉 업데이트 (갱신 주기 경과 시에만 REST 호출)
   try:
-    candle_data = get_min_candle_data(code, [1, 5, 15])
-    if candle_data:
-      market_data_cache[ticker] = {
-        "1m": candle_data.get(1),
-        "5m": candle_data.get(5),
-        "15m": candle_data.get(15),
-      }
-
-      df_orderbook = get_orderbook_data(code)
+    if time.monotonic() - _last_candle_fetch.get(ticker, 0.0) >= _CANDLE_REFRESH_SEC:
+      # 전략은 최근 300행만 읽으므로 2페이지(400행)면 충분 → 호출/캐시 메모리 절감
+      candle_data = get_min_candle_data(code, [1, 5, 15], pages=2)
+      if candle_data:
+        _last_candle_fetch[ticker] = time.monotonic()
+        update_candle_cache(ticker, "1m", candle_data.get(1))
+        update_candle_cache(ticker, "5m", candle_data.get(5))
+        update_candle_cache(ticker, "15m", candle_data.get(15))
+        market_data_cache[ticker] = {
+          "1m": candle_data.get(1),
+          "5m": candle_data.get(5),
+          "15m": candle_data.get(15),
+        }
+
+    if ticker in market_data_cache:
+      # ✅ 웹소켓 푸시 주문장 우선 사용, 수신 전이면 REST 폴백
+      raw_orderbook = _orderbook_cache.get(ticker)
+      df_orderbook = orderbook_to_df(raw_orderbook) if raw_orderbook else get_orderbook_data(code)
       if df_orderbook is None or df_orderbook.empty:
         print(f"⚠️ {ticker} 주문장 없음")
         return
 
-      account_data = get_my_exchange_account()
+      account_data = get_account_cached()  # ✅ 틱마다 REST 호출 대신 TTL 캐시
       if not account_data:
         print("🚨 잔고 조회 실패")
         return
@@ -66,10 +129,14 @@ def on_message(ws, message):
       available_krw = account_data.get("KRW", 0)
       position.update(account_data.get("assets", {}))
 
-      # 전략 실행
-      process_ticker(ticker, account_data, available_krw)
+      # 전략 실행 (중복 실행은 process_ticker가 차단)
+      # ✅ 이미 변환한 주문장을 전달해 process_ticker의 REST 재조회 제거
+      process_ticker(ticker, account_data, available_krw, df_orderbook=df_orderbook)
   except Exception as e:
     print(f"🚨 {ticker} 데이터 처리 중 오류: {e}")
+  finally:
+    with _inflight_lock:
+      _inflight_tickers.discard(ticker)
 
 def on_error(ws, error):
   print("🚨 웹소켓 에러:", error)
@@ -78,9 +145,11 @@ def on_close(ws, close_status_code, close_msg):
   print("❌ 웹소켓 연결 종료됨")
 
 def on_open(ws):
+  codes = [f"KRW-{ticker}" for ticker in TRADE_TICKERS]
   payload = [
     {"ticket": "realtime-ticker"},
-    {"type": "ticker", "codes": [f"KRW-{ticker}" for ticker in TRADE_TICKERS]},
+    {"type": "ticker", "codes": codes},
+    {"type": "orderbook", "codes": codes},  # ✅ 주문장도 푸시로 수신 (REST 폴링 제거)
   ]
   ws.send(json.dumps(payload))
 